@@ -0,0 +1,437 @@
+import asyncio
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+
+class SilenceSuppressor:
+    """Drops non-speech audio, keeping a pre-roll ring buffer and a hangover tail
+
+    Frames seen while idle are held in a fixed-size ring buffer and flushed
+    in front of the first speech frame so word onsets are not clipped. After
+    speech ends, audio keeps flowing for the hangover period before sending
+    stops. paused is True while audio is being held back; the caller should
+    tell the server the stream paused when it turns True.
+    """
+    def __init__(self, chunk_ms, pre_roll_ms=300, hangover_ms=500):
+        self.pre_roll = deque(maxlen=max(0, round(pre_roll_ms / chunk_ms)))
+        self.hangover_frames = max(0, round(hangover_ms / chunk_ms))
+        self._hangover_left = 0
+        self.frames_suppressed = 0
+        self.paused = True
+
+    def process(self, frame: bytes, is_speech: bool) -> bytes:
+        """Return the audio to send for this frame (empty when suppressed)"""
+        if is_speech:
+            self._hangover_left = self.hangover_frames
+            self.paused = False
+            if self.pre_roll:
+                # Not appended: the ring is usually full and would evict its oldest frame
+                data = b"".join(self.pre_roll) + frame
+                self.pre_roll.clear()
+                return data
+            return frame
+
+        if self._hangover_left > 0:
+            self._hangover_left -= 1
+            return frame
+
+        self.paused = True
+
+        if len(self.pre_roll) == self.pre_roll.maxlen:
+            # Ring is full (or disabled): the oldest frame is dropped for good
+            self.frames_suppressed += 1
+        self.pre_roll.append(frame)
+        return b""
+
+    def reset(self):
+        """Forget buffered pre-roll and any pending hangover"""
+        self.pre_roll.clear()
+        self._hangover_left = 0
+        self.paused = True
+
+
+class AudioPacketizer:
+    """Coalesces consecutive audio frames into larger packets before sending
+
+    A packet is released once it holds packet_bytes of audio, or when the
+    oldest buffered frame has waited max_delay seconds, whichever is first.
+    """
+    def __init__(self, packet_bytes, max_delay=0.1):
+        self.packet_bytes = packet_bytes
+        self.max_delay = max_delay
+        self._buffer = bytearray()
+        self._deadline = None
+        self.packets_sent = 0
+        self.frames_coalesced = 0
+
+    def add(self, frame: bytes, flush=False) -> bytes:
+        """Buffer a frame and return a packet if one is ready (else empty)"""
+        if not self._buffer:
+            self._deadline = time.monotonic() + self.max_delay
+        self._buffer += frame
+        self.frames_coalesced += 1
+        if flush or len(self._buffer) >= self.packet_bytes or time.monotonic() >= self._deadline:
+            return self.flush()
+        return b""
+
+    def flush(self) -> bytes:
+        """Return all buffered audio as one packet and empty the buffer"""
+        if not self._buffer:
+            return b""
+        packet = bytes(self._buffer)
+        self._buffer.clear()
+        self._deadline = None
+        self.packets_sent += 1
+        return packet
+
+    def time_until_due(self):
+        """Seconds until the latency budget forces a flush, or None when empty"""
+        if self._deadline is None:
+            return None
+        return max(0.0, self._deadline - time.monotonic())
+
+
+class JitterBuffer:
+    """Thread-safe byte ring buffer between received audio and the output callback
+
+    Playback starts once target_bytes are buffered (or prime_timeout passes
+    with no new audio, or mark_end() is called, so short tails still play).
+    When the callback drains the buffer mid-stream it pads with silence,
+    counts an underrun and re-buffers to the target depth; draining the
+    tail after mark_end() is not an underrun. Writing past capacity drops
+    the oldest audio and counts an overrun.
+    """
+    def __init__(self, capacity_bytes, target_bytes, prime_timeout=0.1):
+        self.capacity = capacity_bytes
+        self.target_bytes = min(target_bytes, capacity_bytes)
+        self.prime_timeout = prime_timeout
+        self._buffer = bytearray(capacity_bytes)
+        self._read_pos = 0
+        self._size = 0
+        self._last_write = 0.0
+        self._lock = threading.Lock()
+        self.primed = False
+        # No more audio is coming for the current stream (end of turn)
+        self.ended = False
+        self.underruns = 0
+        self.overruns = 0
+        self.bytes_dropped = 0
+        self.bytes_played = 0
+        # Output gain and pause, e.g. for local barge-in ducking
+        self.gain = 1.0
+        self.paused = False
+
+    def write(self, data: bytes):
+        """Append audio, dropping the oldest buffered audio on overflow"""
+        with self._lock:
+            if len(data) > self.capacity:
+                self.bytes_dropped += len(data) - self.capacity
+                data = data[-self.capacity:]
+            n = len(data)
+            overflow = self._size + n - self.capacity
+            if overflow > 0:
+                self._read_pos = (self._read_pos + overflow) % self.capacity
+                self._size -= overflow
+                self.overruns += 1
+                self.bytes_dropped += overflow
+
+            write_pos = (self._read_pos + self._size) % self.capacity
+            first = min(n, self.capacity - write_pos)
+            self._buffer[write_pos:write_pos + first] = data[:first]
+            if first < n:
+                self._buffer[:n - first] = data[first:]
+            self._size += n
+            self._last_write = time.monotonic()
+            self.ended = False
+            if self._size >= self.target_bytes:
+                self.primed = True
+
+    def read(self, n: int) -> bytes:
+        """Return exactly n bytes for the output device, padding with silence"""
+        with self._lock:
+            if not self.primed and self._size and (
+                self.ended or time.monotonic() - self._last_write >= self.prime_timeout
+            ):
+                self.primed = True
+            if not self.primed or self.paused:
+                return bytes(n)
+
+            available = min(n, self._size)
+            first = min(available, self.capacity - self._read_pos)
+            out = self._buffer[self._read_pos:self._read_pos + first]
+            if first < available:
+                out += self._buffer[:available - first]
+            self._read_pos = (self._read_pos + available) % self.capacity
+            self._size -= available
+            self.bytes_played += available
+
+            if available < n:
+                out += bytes(n - available)
+                if not self.ended:
+                    self.underruns += 1
+            if not self._size:
+                self.primed = False
+
+        if self.gain != 1.0:
+            scaled = np.frombuffer(out, dtype=np.int16) * self.gain
+            return scaled.astype(np.int16).tobytes()
+        return bytes(out)
+
+    def mark_end(self):
+        """No more audio follows what is buffered; let it play out without underruns"""
+        with self._lock:
+            self.ended = True
+
+    def clear(self):
+        """Discard all buffered audio"""
+        with self._lock:
+            self._read_pos = 0
+            self._size = 0
+            self.primed = False
+
+    @property
+    def occupancy(self) -> int:
+        """Number of buffered bytes not yet handed to the device"""
+        return self._size
+
+    @property
+    def is_playing(self) -> bool:
+        """True while buffered audio is being played out"""
+        return self.primed and self._size > 0
+
+
+class CaptureRing:
+    """Bounded frame ring filled by an audio callback thread and drained on the event loop
+
+    push() runs on the PortAudio thread: deque.append with maxlen is atomic,
+    so no lock is taken, and the loop is only woken via call_soon_threadsafe
+    when it is not already flagged. When the ring is full the oldest frame
+    is dropped and counted as an overflow. Frames are stamped with
+    time.perf_counter() on push; last_captured_at is the stamp of the frame
+    most recently returned by get().
+    """
+    def __init__(self, loop, max_frames=64):
+        self._loop = loop
+        self._frames = deque(maxlen=max_frames)
+        self._ready = asyncio.Event()
+        self.overflows = 0
+        self.device_overflows = 0
+        self.last_captured_at = None
+
+    def push(self, frame: bytes, device_overflow=False):
+        """Add a captured frame (audio thread)"""
+        if device_overflow:
+            self.device_overflows += 1
+        if len(self._frames) == self._frames.maxlen:
+            self.overflows += 1
+        self._frames.append((frame, time.perf_counter()))
+        if not self._ready.is_set():
+            try:
+                self._loop.call_soon_threadsafe(self._ready.set)
+            except RuntimeError:
+                # Event loop already closed
+                pass
+
+    async def get(self) -> bytes:
+        """Wait for and return the oldest captured frame (event loop)"""
+        while not self._frames:
+            self._ready.clear()
+            if self._frames:
+                break
+            await self._ready.wait()
+        frame, self.last_captured_at = self._frames.popleft()
+        return frame
+
+    def __len__(self):
+        return len(self._frames)
+
+
+class Turn:
+    """Timing of one model turn from first audio received to end of playback"""
+    def __init__(self, number, received_at, user_speech_end, played_offset):
+        self.number = number
+        self.received_at = received_at
+        self.user_speech_end = user_speech_end
+        self.played_offset = played_offset
+        self.first_audible_at = None
+        self.ended_at = None
+        self.audio_bytes = 0
+        self.complete = False
+        self.interrupted = False
+
+    def summary(self, bytes_per_second):
+        """Return turn timings in milliseconds / seconds"""
+        stats = {
+            "turn": self.number,
+            "interrupted": self.interrupted,
+            "audio_s": self.audio_bytes / bytes_per_second,
+            "time_to_first_audio_ms": None,
+            "time_to_first_chunk_ms": None,
+            "buffering_ms": None,
+            "playback_s": None
+        }
+        if self.user_speech_end is not None:
+            stats["time_to_first_chunk_ms"] = (self.received_at - self.user_speech_end) * 1000
+        if self.first_audible_at is not None:
+            if self.user_speech_end is not None:
+                stats["time_to_first_audio_ms"] = (self.first_audible_at - self.user_speech_end) * 1000
+            stats["buffering_ms"] = (self.first_audible_at - self.received_at) * 1000
+            if self.ended_at is not None:
+                stats["playback_s"] = self.ended_at - self.first_audible_at
+        return stats
+
+
+class PlaybackScheduler:
+    """Feeds received audio into the jitter buffer and tracks model turns explicitly
+
+    A completed turn plays out to the end: it only finishes once the
+    jitter buffer has drained. An interrupted turn is flushed at once.
+    Each finished turn's time-to-first-audio (from the end of the user's
+    speech), buffering delay and playback duration are recorded and passed
+    to on_finish(stats) if given.
+    """
+    def __init__(self, jitter_buffer, bytes_per_second, on_finish=None):
+        self.jitter_buffer = jitter_buffer
+        self.bytes_per_second = bytes_per_second
+        self.on_finish = on_finish
+        self.current = None
+        self.turns = []
+        self._turn_count = 0
+        self._user_speech_end = None
+
+    @property
+    def active(self) -> bool:
+        return self.current is not None
+
+    def on_user_speech_end(self):
+        self._user_speech_end = time.monotonic()
+
+    def on_audio(self, chunk: bytes):
+        """Queue a chunk of model audio for playback"""
+        if self.current is None:
+            self._turn_count += 1
+            self.current = Turn(
+                self._turn_count, time.monotonic(), self._user_speech_end,
+                self.jitter_buffer.bytes_played
+            )
+            self._user_speech_end = None
+        self.current.audio_bytes += len(chunk)
+        self.jitter_buffer.write(chunk)
+
+    def on_turn_complete(self):
+        """The server finished the turn; let buffered audio play out"""
+        self.jitter_buffer.mark_end()
+        if self.current is not None:
+            self.current.complete = True
+            self.poll()
+
+    def on_interrupted(self):
+        """The server signalled barge-in; drop buffered audio immediately"""
+        self.jitter_buffer.clear()
+        if self.current is not None:
+            self.current.interrupted = True
+            self._finish()
+
+    def poll(self):
+        """Update playback progress of the current turn"""
+        turn = self.current
+        if turn is None:
+            return
+        if turn.first_audible_at is None and self.jitter_buffer.bytes_played > turn.played_offset:
+            turn.first_audible_at = time.monotonic()
+        if turn.complete and not self.jitter_buffer.occupancy:
+            self._finish()
+
+    def _finish(self):
+        turn = self.current
+        self.current = None
+        if turn.first_audible_at is None and self.jitter_buffer.bytes_played > turn.played_offset:
+            turn.first_audible_at = time.monotonic()
+        turn.ended_at = time.monotonic()
+        stats = turn.summary(self.bytes_per_second)
+        self.turns.append(stats)
+        print(format_turn(stats))
+        if self.on_finish:
+            self.on_finish(stats)
+
+
+def format_turn(stats):
+    """One-line description of a finished turn"""
+    def ms(value):
+        return "n/a" if value is None else f"{value:.0f} ms"
+
+    played = "n/a" if stats["playback_s"] is None else f"{stats['playback_s']:.2f}s"
+    return (
+        f"Turn {stats['turn']}{' (interrupted)' if stats['interrupted'] else ''}: "
+        f"time to first audio {ms(stats['time_to_first_audio_ms'])}, "
+        f"buffering {ms(stats['buffering_ms'])}, "
+        f"played {played} of {stats['audio_s']:.2f}s audio"
+    )
+
+
+class BargeInController:
+    """Ducks or pauses local playback as soon as the user talks over it
+
+    Engaged by a local VAD speech start while audio is playing, so the
+    user does not wait a server round-trip. If the server then signals
+    interrupted, the flushed playback is simply released; if it does not
+    within resume_after seconds of the user going quiet, it was a false
+    alarm and playback resumes at full volume.
+    """
+    MODES = ("off", "duck", "pause")
+
+    def __init__(self, jitter_buffer, mode="duck", duck_gain=0.2, resume_after=1.5):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown barge-in mode {mode!r}, expected one of {self.MODES}")
+        self.jitter_buffer = jitter_buffer
+        self.mode = mode
+        self.duck_gain = duck_gain
+        self.resume_after = resume_after
+        self.engaged_at = None
+        self._user_speaking = False
+        self._speech_end = None
+        self.confirmed = 0
+        self.resumed = 0
+        self.confirm_latencies = []
+
+    @property
+    def engaged(self) -> bool:
+        return self.engaged_at is not None
+
+    def on_user_speech_start(self):
+        self._user_speaking = True
+        if self.mode == "off" or self.engaged or not self.jitter_buffer.is_playing:
+            return
+        if self.mode == "duck":
+            self.jitter_buffer.gain = self.duck_gain
+        else:
+            self.jitter_buffer.paused = True
+        self.engaged_at = time.monotonic()
+        print(f"Barge-in: playback {'ducked' if self.mode == 'duck' else 'paused'}")
+
+    def on_user_speech_end(self):
+        self._user_speaking = False
+        self._speech_end = time.monotonic()
+
+    def on_interrupted(self):
+        """The server confirmed the interruption; buffered audio is already flushed"""
+        if self.engaged:
+            self.confirmed += 1
+            self.confirm_latencies.append(time.monotonic() - self.engaged_at)
+            self._release()
+
+    def poll(self):
+        """Resume playback if the server never confirmed the interruption"""
+        if (self.engaged and not self._user_speaking and self._speech_end is not None
+                and time.monotonic() - max(self._speech_end, self.engaged_at) >= self.resume_after):
+            self.resumed += 1
+            print("Barge-in: not confirmed by server, resuming playback")
+            self._release()
+
+    def _release(self):
+        self.jitter_buffer.gain = 1.0
+        self.jitter_buffer.paused = False
+        self.engaged_at = None
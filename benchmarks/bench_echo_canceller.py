@@ -0,0 +1,139 @@
+"""Benchmark the acoustic echo canceller on synthetic speaker echo
+
+Runs the canceller over several far-end / near-end scenarios at 24 kHz
+playback and a 16 kHz mic with a simulated room echo path (bulk delay
+plus a decaying tail): a noise-like far end, a harmonic (speech-like)
+far end, a harmonic far end with a near-end talker in the second half
+(double talk), and a near-end talker with no echo path at all. Reports
+CPU time per 512-sample frame, echo return loss enhancement (ERLE) once
+the filter has converged, and checks that the output never carries more
+energy than the mic did; the exit status is non-zero if it does.
+
+    python benchmarks/bench_echo_canceller.py [--seconds 10] [--delay-ms 40] [--partitions 4]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from echo_canceller import EchoCanceller  # noqa: E402
+from resampler import Resampler  # noqa: E402
+
+FRAME = 512
+MIC_RATE = 16000
+PLAYBACK_RATE = 24000
+
+
+def noise_far_end(seconds, rng):
+    """Noise-like far end: tones plus noise with a syllable-rate envelope, int16 at 24 kHz"""
+    t = np.arange(int(seconds * PLAYBACK_RATE)) / PLAYBACK_RATE
+    tones = sum(np.sin(2 * np.pi * f * t + rng.uniform(0, 2 * np.pi)) for f in (180, 420, 950, 2100))
+    envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 4 * t) ** 2
+    signal = (tones / 4 + 0.2 * rng.standard_normal(len(t))) * envelope * 0.3
+    return (signal * 32767).astype(np.int16)
+
+
+def harmonic_far_end(seconds, rng):
+    """Speech-like far end: a few harmonics of a drifting pitch, most bins empty, int16 at 24 kHz"""
+    t = np.arange(int(seconds * PLAYBACK_RATE)) / PLAYBACK_RATE
+    pitch = 140 * (1 + 0.05 * np.sin(2 * np.pi * 0.5 * t))
+    phase = 2 * np.pi * np.cumsum(pitch) / PLAYBACK_RATE
+    signal = sum(np.sin(k * phase) / k for k in (1, 2, 3, 6))
+    envelope = 0.3 + 0.7 * np.abs(np.sin(2 * np.pi * 3 * t))
+    return (signal / 2 * envelope * 12000).astype(np.int16)
+
+
+def near_end_talker(samples, rng):
+    """Voiced near-end speech at the mic: a pitch-modulated buzz gated at syllable rate"""
+    t = np.arange(samples) / MIC_RATE
+    phase = 2 * np.pi * np.cumsum(110 * (1 + 0.1 * np.sin(2 * np.pi * 1.3 * t))) / MIC_RATE
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 8))
+    gate = np.sin(2 * np.pi * 2 * t) > -0.3
+    return voiced * gate * 2000 + rng.standard_normal(samples) * 100
+
+
+def echo_path(delay_ms, rng, length_ms=60, gain=0.3):
+    """Bulk delay followed by a decaying random room response"""
+    delay = int(MIC_RATE * delay_ms / 1000)
+    tail = int(MIC_RATE * length_ms / 1000)
+    response = rng.standard_normal(tail) * np.exp(-np.arange(tail) / (tail / 5)) * gain / 15
+    response[0] = gain
+    return np.concatenate((np.zeros(delay), response))
+
+
+def run_scenario(far, echo_gain, near_from, args, rng):
+    """Run one scenario; returns (cpu ms per frame, ERLE dB or None, output/mic energy, canceller)"""
+    far_at_mic_rate = Resampler(PLAYBACK_RATE, MIC_RATE).process(far.astype(np.float32))
+    mic = np.convolve(far_at_mic_rate, echo_path(args.delay_ms, rng, gain=echo_gain))[:len(far_at_mic_rate)]
+    mic += rng.standard_normal(len(mic)) * 30  # mic noise floor
+    talk_start = len(mic)
+    if near_from is not None:
+        talk_start = int(len(mic) * near_from)
+        mic[talk_start:] += near_end_talker(len(mic) - talk_start, rng)
+    mic = np.clip(mic, -32768, 32767).astype(np.int16)
+
+    canceller = EchoCanceller(FRAME, MIC_RATE, PLAYBACK_RATE, partitions=args.partitions)
+    playback_frame = FRAME * PLAYBACK_RATE // MIC_RATE
+    frames = len(mic) // FRAME
+    converged = frames // 4
+    echo_energy = residual_energy = mic_energy = output_energy = 0.0
+    cpu = []
+    for i in range(frames):
+        canceller.push_reference(far[i * playback_frame:(i + 1) * playback_frame].tobytes())
+        near = mic[i * FRAME:(i + 1) * FRAME]
+        start = time.process_time()
+        out = np.frombuffer(canceller.process(near.tobytes()), dtype=np.int16)
+        cpu.append(time.process_time() - start)
+        near_energy = np.sum(near.astype(np.float64) ** 2)
+        out_energy = np.sum(out.astype(np.float64) ** 2)
+        mic_energy += near_energy
+        output_energy += out_energy
+        if echo_gain and converged <= i and (i + 1) * FRAME <= talk_start:
+            echo_energy += near_energy
+            residual_energy += out_energy
+
+    erle = None
+    if echo_energy:
+        erle = 10 * np.log10(echo_energy / max(residual_energy, 1e-9))
+    return np.array(cpu) * 1000, erle, output_energy / max(mic_energy, 1e-9), canceller
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--delay-ms", type=float, default=40.0, help="playback-to-mic bulk delay")
+    parser.add_argument("--partitions", type=int, default=4)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    scenarios = (
+        ("noise far end", noise_far_end, 0.3, None),
+        ("harmonic far end", harmonic_far_end, 0.3, None),
+        ("harmonic + double talk", harmonic_far_end, 0.3, 0.5),
+        ("near end only", harmonic_far_end, 0.0, 0.0),
+    )
+    frame_ms = FRAME * 1000 / MIC_RATE
+    print(f"{FRAME}-sample frames of {frame_ms:.0f} ms, {args.partitions} partitions, {args.delay_ms:.0f} ms delay")
+    print(f"{'scenario':<24}{'cpu ms':>8}{'p99':>8}{'ERLE dB':>9}{'out/mic':>9}{'dbl talk':>10}{'resets':>8}")
+    failed = False
+    for name, far_end, echo_gain, near_from in scenarios:
+        cpu_ms, erle, energy_ratio, canceller = run_scenario(
+            far_end(args.seconds, rng), echo_gain, near_from, args, rng
+        )
+        erle_text = f"{erle:.1f}" if erle is not None else "-"
+        print(
+            f"{name:<24}{cpu_ms.mean():>8.3f}{np.percentile(cpu_ms, 99):>8.3f}{erle_text:>9}"
+            f"{energy_ratio:>9.3f}{canceller.double_talk_frames:>10}{canceller.divergence_resets:>8}"
+        )
+        if energy_ratio > 1.0:
+            print(f"  FAIL: output carries more energy than the mic ({energy_ratio:.2f}x)")
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""Microbenchmark for realtime_input message encoding
+
+Compares the original dict + base64 + json.dumps path against
+MediaChunkEncoder for a 512-sample PCM chunk and a 1200px JPEG frame.
+
+    python benchmarks/bench_encoding.py [--jpeg path/to/frame.jpg]
+"""
+import argparse
+import base64
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from message_encoder import MediaChunkEncoder, orjson  # noqa: E402
+
+# A 1200px-wide JPEG at PIL's default quality is typically 100-200 KB
+DEFAULT_JPEG_BYTES = 150_000
+
+
+def encode_dict(data, mime_type):
+    msg = {
+        "realtime_input": {
+            "media_chunks": [
+                {
+                    "data": base64.b64encode(data).decode(),
+                    "mime_type": mime_type
+                }
+            ]
+        }
+    }
+    return json.dumps(msg)
+
+
+def bench(label, fn, number):
+    per_call = min(timeit.repeat(fn, number=number, repeat=5)) / number
+    print(f"  {label:<32} {per_call * 1e6:10.2f} us/msg")
+    return per_call
+
+
+def run_case(name, data, mime_type, number):
+    print(f"{name} ({len(data)} bytes):")
+    encoder = MediaChunkEncoder(mime_type)
+    assert json.loads(encoder.encode_text(data)) == json.loads(encode_dict(data, mime_type))
+
+    baseline = bench("dict + json.dumps", lambda: encode_dict(data, mime_type), number)
+    template = bench("MediaChunkEncoder.encode", lambda: encoder.encode(data), number)
+    assert encoder.encode_bytes(data) == bytes(encoder.encode(data))
+    bench("MediaChunkEncoder.encode_bytes", lambda: encoder.encode_bytes(data), number)
+    bench("MediaChunkEncoder.encode_text", lambda: encoder.encode_text(data), number)
+    if orjson is not None:
+        bench("dict + orjson.dumps", lambda: orjson.dumps({
+            "realtime_input": {"media_chunks": [{
+                "data": base64.b64encode(data).decode(), "mime_type": mime_type
+            }]}
+        }), number)
+    print(f"  speedup (encode vs dict): {baseline / template:.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jpeg", help="JPEG file to use instead of random bytes")
+    parser.add_argument("--number", type=int, default=2000, help="calls per timing run")
+    args = parser.parse_args()
+
+    audio = os.urandom(512 * 2)
+    if args.jpeg:
+        with open(args.jpeg, "rb") as f:
+            jpeg = f.read()
+    else:
+        jpeg = os.urandom(DEFAULT_JPEG_BYTES)
+
+    run_case("512-sample PCM chunk", audio, "audio/pcm", args.number)
+    run_case("1200px JPEG frame", jpeg, "image/jpeg", max(1, args.number // 20))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Benchmark JPEG encoders on camera-like and screen-like frames
+
+Reports per-frame latency (downscale + encode) and bytes per frame for
+each available encoder in image_encoders, at the given JPEG quality.
+
+    python benchmarks/bench_image_encoders.py [--quality 75] [--screen] [--camera]
+
+--screen and --camera grab a real frame with mss / OpenCV instead of the
+synthetic inputs.
+"""
+import argparse
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from image_encoders import ENCODERS  # noqa: E402
+from video_capture import downscale  # noqa: E402
+
+MAX_SIZE = 1200
+
+
+def synthetic_camera(height=720, width=1280):
+    """Smooth gradients plus sensor-like noise, BGR"""
+    y, x = np.mgrid[0:height, 0:width]
+    base = np.stack([x * 255 // width, y * 255 // height, (x + y) * 255 // (width + height)], axis=2)
+    noise = np.random.default_rng(0).integers(-12, 12, size=base.shape)
+    return np.clip(base + noise, 0, 255).astype(np.uint8)
+
+
+def synthetic_screen(height=1080, width=1920):
+    """Flat panels with sharp, text-like high-contrast detail, BGRA"""
+    rng = np.random.default_rng(1)
+    frame = np.full((height, width, 4), 240, dtype=np.uint8)
+    frame[:60] = (60, 60, 60, 255)
+    frame[:, :300] = (45, 45, 45, 255)
+    for row in range(100, height - 20, 24):
+        length = int(rng.integers(200, width - 400))
+        glyphs = rng.integers(0, 2, size=(12, length)).astype(bool)
+        frame[row:row + 12, 340:340 + length][glyphs] = (20, 20, 20, 255)
+    return frame
+
+
+def grab_screen():
+    import mss
+    with mss.mss() as sct:
+        return np.asarray(sct.grab(sct.monitors[1])).copy()
+
+
+def grab_camera():
+    import cv2
+    cap = cv2.VideoCapture(0)
+    try:
+        ok, frame = cap.read()
+        if not ok:
+            raise RuntimeError("could not read from camera")
+        return frame
+    finally:
+        cap.release()
+
+
+def run_case(name, pixels, encoders, quality, number):
+    print(f"{name} ({pixels.shape[1]}x{pixels.shape[0]}x{pixels.shape[2]}):")
+    for encoder in encoders:
+        def encode():
+            return encoder.encode(downscale(pixels, MAX_SIZE), MAX_SIZE, quality)
+        size = len(encode())
+        per_frame = min(timeit.repeat(encode, number=number, repeat=3)) / number
+        print(f"  {encoder.name:<8} {per_frame * 1000:8.2f} ms/frame {size / 1024:9.1f} KiB/frame")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--quality", type=int, default=75)
+    parser.add_argument("--number", type=int, default=20, help="frames per timing run")
+    parser.add_argument("--screen", action="store_true", help="use a real screen grab")
+    parser.add_argument("--camera", action="store_true", help="use a real camera frame")
+    args = parser.parse_args()
+
+    encoders = []
+    for name, encoder_class in ENCODERS.items():
+        try:
+            encoders.append(encoder_class())
+        except ImportError as e:
+            print(f"Skipping {name} encoder: {e}")
+    if not encoders:
+        sys.exit("No JPEG encoder available; install opencv-python or Pillow")
+
+    camera = grab_camera() if args.camera else synthetic_camera()
+    screen = grab_screen() if args.screen else synthetic_screen()
+    run_case("camera", camera, encoders, args.quality, args.number)
+    run_case("screen", screen, encoders, args.quality, args.number)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Benchmark in-process resampling for native-rate audio devices
+
+Reports per-callback CPU time and quality of the capture path (device
+rate, stereo float32 -> 16 kHz mono int16 frames) and the playback path
+(24 kHz mono int16 -> device rate, stereo float32) for common device
+rates. Quality is the level of a 1 kHz test tone after conversion
+(should be ~0 dB) and the residual against an ideal tone.
+
+    python benchmarks/bench_resampler.py [--rates 44100 48000 96000] [--channels 2]
+"""
+import argparse
+import itertools
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from resampler import CaptureConverter, PlaybackConverter  # noqa: E402
+
+MIC_RATE = 16000
+MIC_CHUNK = 512
+PLAYBACK_RATE = 24000
+PLAYBACK_CHUNK = 480
+TONE_HZ = 1000
+
+
+def tone(rate, seconds=1.0, amplitude=0.5):
+    t = np.arange(int(rate * seconds)) / rate
+    return (amplitude * np.sin(2 * np.pi * TONE_HZ * t)).astype(np.float32)
+
+
+def tone_quality(samples, rate, amplitude=0.5):
+    """(level dB relative to amplitude, residual dB) from a least-squares sine fit"""
+    samples = samples[len(samples) // 4:]
+    t = np.arange(len(samples)) / rate
+    basis = np.stack([np.sin(2 * np.pi * TONE_HZ * t), np.cos(2 * np.pi * TONE_HZ * t)], axis=1)
+    coeffs = np.linalg.lstsq(basis, samples, rcond=None)[0]
+    residual = samples - basis @ coeffs
+    level = 20 * np.log10(np.hypot(*coeffs) / amplitude)
+    noise = 10 * np.log10(np.mean(residual ** 2) / (amplitude ** 2 / 2))
+    return level, noise
+
+
+def bench_capture(rate, channels, number):
+    device_chunk = round(MIC_CHUNK * rate / MIC_RATE)
+    source = np.repeat(tone(rate), channels)
+    blocks = [source[i:i + device_chunk * channels].tobytes()
+              for i in range(0, len(source) - device_chunk * channels + 1, device_chunk * channels)]
+
+    converter = CaptureConverter(rate, channels, MIC_RATE, MIC_CHUNK)
+    frames = [frame for block in blocks for frame in converter.process(block)]
+    out = np.frombuffer(b"".join(frames), dtype=np.int16).astype(np.float32) / 32768
+    level, noise = tone_quality(out, MIC_RATE)
+
+    converter = CaptureConverter(rate, channels, MIC_RATE, MIC_CHUNK)
+    block = itertools.cycle(blocks)
+    per_call = min(timeit.repeat(lambda: converter.process(next(block)), number=number, repeat=3)) / number
+    return per_call, level, noise
+
+
+def bench_playback(rate, channels, number):
+    device_chunk = round(PLAYBACK_CHUNK * rate / PLAYBACK_RATE)
+    pcm = (tone(PLAYBACK_RATE, seconds=2.0) * 32767).astype(np.int16).tobytes()
+    position = 0
+
+    def source(nbytes):
+        nonlocal position
+        data = pcm[position:position + nbytes]
+        position = (position + nbytes) % (len(pcm) - nbytes)
+        return data + bytes(nbytes - len(data))
+
+    converter = PlaybackConverter(rate, channels, PLAYBACK_RATE)
+    blocks = [converter.read(device_chunk, source) for _ in range(rate // device_chunk)]
+    out = np.frombuffer(b"".join(blocks), dtype=np.float32)[::channels]
+    level, noise = tone_quality(out, rate)
+
+    per_call = min(timeit.repeat(lambda: converter.read(device_chunk, source), number=number, repeat=3)) / number
+    return per_call, level, noise
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rates", type=int, nargs="+", default=[16000, 22050, 44100, 48000, 96000])
+    parser.add_argument("--channels", type=int, default=2)
+    parser.add_argument("--number", type=int, default=500, help="callbacks per timing run")
+    args = parser.parse_args()
+
+    print(f"{'path':<9}{'device':>9} {'us/callback':>12} {'% realtime':>11} {'tone dB':>8} {'residual dB':>12}")
+    for rate in args.rates:
+        for path, bench, chunk_s in (
+            ("capture", bench_capture, MIC_CHUNK / MIC_RATE),
+            ("playback", bench_playback, PLAYBACK_CHUNK / PLAYBACK_RATE),
+        ):
+            per_call, level, noise = bench(rate, args.channels, args.number)
+            print(
+                f"{path:<9}{rate:>9} {per_call * 1e6:12.1f} {per_call / chunk_s * 100:10.3f}% "
+                f"{level:8.2f} {noise:12.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,381 @@
+"""End-to-end session benchmark against the local mock Gemini server
+
+Runs one or more GeminiConnection sessions concurrently in a
+SessionManager (one event loop, shared VAD executor), with microphone
+input played from WAV files and the speaker
+replaced by a paced sink, against benchmarks/mock_server.py started in
+a child process (so client CPU is measured on its own). Reports uplink
+and downlink throughput, messages per second, client CPU per session
+and the pipeline latency percentiles from each session's metrics.
+
+    python benchmarks/bench_session.py speech.wav [more.wav ...] [--sessions 4] [--speed 1.0]
+
+WAV files may be any rate / channel count; they are converted to 16 kHz
+mono with the capture converter. Without files formant-synthesized
+utterances are used. Every input is run through the VAD first and the
+benchmark stops if it never detects speech. Sessions whose capture dies
+or that outlive --timeout-s count as failed and give a non-zero exit
+status. Requires the full runtime (pyaudio, torch, websockets); no audio
+devices are opened.
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import wave
+
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+os.environ.setdefault("GEMINI_API_KEY", "mock")
+
+from gemini_connection import GeminiConnection  # noqa: E402
+from metrics import Histogram  # noqa: E402
+from resampler import CaptureConverter  # noqa: E402
+from session_manager import SessionManager  # noqa: E402
+from voice_activity_detector import VADResult, VoiceActivityDetector  # noqa: E402
+
+MIC_RATE = 16000
+CHUNK = 512
+REPORTED = (
+    "capture_wait_ms", "vad_ms", "encode_ms", "send_ms", "uplink_ms",
+    "decode_ms", "audio_queue_wait_ms", "playback_write_ms",
+    "time_to_first_chunk_ms", "time_to_first_audio_ms"
+)
+
+
+def load_wav(path):
+    """Return the file as CHUNK-sample frames of 16 kHz mono int16"""
+    with wave.open(path, "rb") as f:
+        if f.getsampwidth() != 2:
+            raise ValueError(f"{path}: only 16-bit PCM WAV files are supported")
+        data = f.readframes(f.getnframes())
+        converter = CaptureConverter(f.getframerate(), f.getnchannels(), MIC_RATE, CHUNK, np.int16)
+    return converter.process(data)
+
+
+# (F1, F2, F3) in Hz for the vowels a, i, u, e, o
+VOWEL_FORMANTS = ((730, 1090, 2440), (270, 2290, 3010), (300, 870, 2240), (530, 1840, 2480), (570, 840, 2410))
+FORMANT_BANDWIDTHS = (60, 90, 120)
+
+
+def formant_filter(signal, formants):
+    """Cascade of two-pole formant resonators, applied in the frequency domain"""
+    n = 2 * len(signal)
+    z = np.exp(-2j * np.pi * np.fft.rfftfreq(n, 1 / MIC_RATE) / MIC_RATE)
+    response = np.ones(len(z), dtype=np.complex128)
+    for frequency, bandwidth in zip(formants, FORMANT_BANDWIDTHS):
+        r = np.exp(-np.pi * bandwidth / MIC_RATE)
+        cos_theta = np.cos(2 * np.pi * frequency / MIC_RATE)
+        response *= (1 - 2 * r * cos_theta + r * r) / (1 - 2 * r * cos_theta * z + r * r * z * z)
+    return np.fft.irfft(np.fft.rfft(signal, n) * response, n)[:len(signal)]
+
+
+def synthetic_speech(utterances=4, speech_s=1.6, pauses_s=(3.0, 1.2, 3.0, 3.0)):
+    """Formant-synthesized utterances separated by silence, as CHUNK-sample frames
+
+    Each utterance is a string of 160-260 ms syllables: a Rosenberg glottal
+    pulse train with a drifting pitch through vowel formant resonators,
+    some with a fricative noise onset. The short second pause makes the
+    next utterance start while the previous reply is still streaming, so
+    runs with --interruptions exercise barge-in.
+    """
+    rng = np.random.default_rng(0)
+    parts = []
+    for index in range(utterances):
+        syllables = []
+        remaining = int(speech_s * MIC_RATE)
+        base_pitch = rng.uniform(110, 140)
+        while remaining > 0:
+            length = min(remaining, int(rng.uniform(0.16, 0.26) * MIC_RATE))
+            remaining -= length
+            t = np.arange(length) / MIC_RATE
+            pitch = base_pitch * (1 + 0.08 * np.sin(2 * np.pi * rng.uniform(1, 3) * t + rng.uniform(0, 6)))
+            phase = np.cumsum(pitch) / MIC_RATE % 1.0
+            flow = np.where(phase < 0.4, 0.5 * (1 - np.cos(np.pi * phase / 0.4)),
+                            np.where(phase < 0.56, np.cos(np.pi * (phase - 0.4) / 0.32), 0.0))
+            # Differentiated glottal flow approximates lip radiation
+            source = np.diff(flow, prepend=0.0) + rng.standard_normal(length) * 0.002
+            voiced = formant_filter(source, VOWEL_FORMANTS[rng.integers(len(VOWEL_FORMANTS))])
+            syllable = voiced * np.sin(np.pi * np.arange(length) / length) ** 0.6
+            if rng.random() < 0.5:
+                onset = int(0.05 * MIC_RATE)
+                noise = np.fft.rfft(rng.standard_normal(onset))
+                noise[:2500 * onset // MIC_RATE] = 0
+                fricative = np.fft.irfft(noise, onset) * np.hanning(onset) * np.std(voiced) * 0.5
+                syllable = np.concatenate((fricative, syllable))
+            syllables.append(syllable)
+        utterance = np.concatenate(syllables)
+        parts.append(utterance / np.sqrt(np.mean(utterance ** 2)) * 3000)
+        parts.append(rng.standard_normal(int(pauses_s[index % len(pauses_s)] * MIC_RATE)) * 30)
+    pcm = np.clip(np.concatenate(parts), -32768, 32767).astype(np.int16)
+    usable = len(pcm) // CHUNK * CHUNK
+    return [frame.tobytes() for frame in pcm[:usable].reshape(-1, CHUNK)]
+
+
+def check_vad(frames):
+    """Run the input through a fresh VAD; returns (speech segments, max probability)"""
+    vad = VoiceActivityDetector()
+    segments = 0
+    max_probability = 0.0
+    for frame in frames:
+        result = vad.push(frame)
+        max_probability = max(max_probability, result.probability)
+        if result.event == VADResult.SPEECH_START:
+            segments += 1
+    return segments, max_probability
+
+
+class PacedStream:
+    """Stand-in for a PyAudio callback stream, driven by a thread at (speed x) real time"""
+    def __init__(self, callback, frames_per_buffer, rate, speed, input_frames=None):
+        self.callback = callback
+        self.frames_per_buffer = frames_per_buffer
+        self.period = frames_per_buffer / rate / speed
+        self.input_frames = input_frames
+        self.finished = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start_stream(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        silence = bytes(self.frames_per_buffer * 2)
+        start = time.perf_counter()
+        index = 0
+        while not self._stop.is_set():
+            if self.input_frames is None:
+                self.callback(None, self.frames_per_buffer, None, 0)
+            elif index < len(self.input_frames):
+                self.callback(self.input_frames[index], self.frames_per_buffer, None, 0)
+            else:
+                self.finished.set()
+                self.callback(silence, self.frames_per_buffer, None, 0)
+            index += 1
+            self._stop.wait(max(0.0, start + index * self.period - time.perf_counter()))
+
+    def stop_stream(self):
+        self._stop.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def close(self):
+        pass
+
+
+class WavSession(GeminiConnection):
+    """GeminiConnection with WAV input and a discarding, paced speaker"""
+    def __init__(self, config, cleanup_event, frames=(), speed=1.0, **kwargs):
+        super().__init__(config, cleanup_event, **kwargs)
+        self.frames = frames
+        self.speed = speed
+        self.input_stream = None
+        self.capture_done = False
+
+    async def capture_audio(self):
+        try:
+            await super().capture_audio()
+        finally:
+            self.capture_done = True
+
+    def _open_input(self, audio, callback=None):
+        self.capture_converter = None
+        self.input_stream = PacedStream(callback, self.CHUNK, self.INPUT_RATE, self.speed, self.frames)
+        return self.input_stream
+
+    def _open_output(self, audio):
+        self.playback_converter = None
+        return PacedStream(self._playback_callback, self.OUTPUT_CHUNK, self.OUTPUT_RATE, self.speed)
+
+
+def is_done(session, tail_deadline):
+    """Input exhausted and the last reply played out (or the tail wait expired)"""
+    if not (session.input_stream and session.input_stream.finished.is_set()):
+        return False
+    played_out = session.playback.turns and not session.playback.active and not session.jitter_buffer.occupancy
+    return played_out or time.monotonic() >= tail_deadline
+
+
+def run_sessions(manager, sessions, tail_s, timeout_s):
+    """Stop each session once done; returns {session_id: error} for the ones that failed
+
+    A session fails if it raises, if its capture task exits while the
+    session is still running, or if it has not finished by the timeout.
+    """
+    deadlines = {}
+    failures = {}
+    give_up = time.monotonic() + timeout_s
+    while sessions:
+        timed_out = time.monotonic() >= give_up
+        for session_id in list(sessions):
+            session = sessions[session_id]
+            if session.input_stream and session.input_stream.finished.is_set():
+                deadlines.setdefault(session_id, time.monotonic() + tail_s)
+            error = None
+            if session.capture_done and session.running:
+                error = "audio capture stopped"
+            elif timed_out:
+                error = f"not finished after {timeout_s:.0f}s"
+            ended = manager.sessions[session_id].state in ("stopped", "failed")
+            if error or ended or (session_id in deadlines and is_done(session, deadlines[session_id])):
+                info = manager.stop_session(session_id)
+                error = error or info["error"]
+                if error:
+                    print(f"{session_id} failed: {error}")
+                    failures[session_id] = error
+                del sessions[session_id]
+        time.sleep(0.1)
+    return failures
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+        return s.getsockname()[1]
+
+
+def start_mock_server(args):
+    port = free_port()
+    server = subprocess.Popen(
+        [
+            sys.executable, os.path.join(ROOT, "benchmarks", "mock_server.py"),
+            "--port", str(port),
+            "--latency-ms", str(args.latency_ms),
+            "--chunk-ms", str(args.chunk_ms),
+            "--reply-s", str(args.reply_s),
+            "--stream-rate", str(args.stream_rate)
+        ],
+        stdout=subprocess.PIPE, text=True
+    )
+    # Wait for the listening line so sessions don't race the server start
+    server.stdout.readline()
+    return server, f"ws://localhost:{port}"
+
+
+def merge(sessions, name):
+    merged = None
+    for session in sessions:
+        histogram = session.metrics.histograms.get(name)
+        if histogram is None:
+            continue
+        if merged is None:
+            merged = Histogram(histogram.buckets)
+        merged.counts = [a + b for a, b in zip(merged.counts, histogram.counts)]
+        merged.count += histogram.count
+        merged.sum += histogram.sum
+        merged.max = max(merged.max, histogram.max)
+    return merged.summary() if merged else {"count": 0}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("wav", nargs="*", help="16-bit PCM WAV files used as microphone input, one per session in turn")
+    parser.add_argument("--sessions", type=int, default=1)
+    parser.add_argument("--speed", type=float, default=1.0, help="feed and play audio this much faster than real time")
+    parser.add_argument("--latency-ms", type=float, default=300, help="mock server response latency")
+    parser.add_argument("--chunk-ms", type=float, default=40, help="mock server audio per message")
+    parser.add_argument("--reply-s", type=float, default=2.0, help="mock server reply length")
+    parser.add_argument("--stream-rate", type=float, default=1.0,
+                        help="mock server reply send speed relative to real time")
+    parser.add_argument("--tail-s", type=float, default=5.0, help="max wait for the last reply after input ends")
+    parser.add_argument("--timeout-s", type=float,
+                        help="fail sessions still running after this long (default: input length + tail + 30s)")
+    parser.add_argument("--server", help="use an already running mock server at this ws:// URL")
+    parser.add_argument("--interruptions", action="store_true", help="allow barge-in (process mic during playback)")
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args()
+
+    inputs = [load_wav(path) for path in args.wav] or [synthetic_speech()]
+    for number, frames in enumerate(inputs):
+        segments, max_probability = check_vad(frames)
+        name = args.wav[number] if args.wav else "synthetic input"
+        print(f"{name}: {segments} speech segment(s), max VAD probability {max_probability:.2f}")
+        if not segments:
+            print(f"Error: {name} never triggers the VAD, so no turns would be produced")
+            return 1
+    input_s = max(len(frames) for frames in inputs) * CHUNK / MIC_RATE / args.speed
+    timeout_s = args.timeout_s or input_s + args.tail_s + 30
+
+    server = None
+    endpoint = args.server
+    if not endpoint:
+        server, endpoint = start_mock_server(args)
+
+    config = {
+        "system_prompt": "",
+        "voice": "Kore",
+        "video_mode": "none",
+        "endpoint": endpoint,
+        "allow_interruptions": args.interruptions,
+        "reconnect": False
+    }
+    try:
+        with SessionManager() as manager:
+            wall_start = time.perf_counter()
+            cpu_start = time.process_time()
+            running = {}
+            for i in range(args.sessions):
+                session_id = manager.start_session(
+                    dict(config), session_class=WavSession, frames=inputs[i % len(inputs)], speed=args.speed
+                )
+                running[session_id] = manager.get_session(session_id)
+            sessions = list(running.values())
+            failures = run_sessions(manager, running, args.tail_s, timeout_s)
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    def total(counter):
+        return sum(session.metrics.counters.get(counter, 0) for session in sessions)
+
+    report = {
+        "sessions": args.sessions,
+        "wall_s": wall,
+        "cpu_s_per_session": cpu / args.sessions,
+        "cpu_percent_per_session": cpu / args.sessions / wall * 100,
+        "uplink_kbps": total("audio_bytes_sent") * 8 / wall / 1000,
+        "uplink_msgs_per_s": total("audio_packets_sent") / wall,
+        "downlink_kbps": total("audio_bytes_received") * 8 / wall / 1000,
+        "downlink_msgs_per_s": total("messages_received") / wall,
+        "turns": total("turns"),
+        "turns_interrupted": total("turns_interrupted"),
+        "failed_sessions": failures,
+        "latency_ms": {name: merge(sessions, name) for name in REPORTED}
+    }
+
+    print(f"{args.sessions} session(s), {wall:.1f}s wall, speed x{args.speed}")
+    print(
+        f"CPU per session: {report['cpu_s_per_session']:.2f}s "
+        f"({report['cpu_percent_per_session']:.1f}% of one core)"
+    )
+    print(f"Uplink: {report['uplink_kbps']:.1f} kbps, {report['uplink_msgs_per_s']:.1f} msgs/s")
+    print(f"Downlink: {report['downlink_kbps']:.1f} kbps, {report['downlink_msgs_per_s']:.1f} msgs/s")
+    print(f"Turns completed: {report['turns']} ({report['turns_interrupted']} interrupted)")
+    if failures:
+        print(f"Failed sessions: {len(failures)} of {args.sessions}")
+    print(f"{'stage':<24}{'n':>7}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}")
+    for name, stats in report["latency_ms"].items():
+        if stats["count"]:
+            print(
+                f"{name:<24}{stats['count']:>7}{stats['p50']:>9.2f}{stats['p90']:>9.2f}"
+                f"{stats['p99']:>9.2f}{stats['max']:>9.2f}"
+            )
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
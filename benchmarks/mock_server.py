@@ -0,0 +1,207 @@
+"""Local stand-in for the Gemini BidiGenerateContent websocket
+
+Speaks enough of the Live API protocol to drive GeminiConnection offline:
+answers setup with setupComplete, decodes realtime_input audio, detects
+the end of each user utterance from its energy (or an audio_stream_end
+message when the client stops sending), and after a configurable
+latency streams a synthetic 24 kHz reply as serverContent.modelTurn
+inlineData chunks followed by turnComplete. Speech that starts while a
+reply is streaming cancels it with an interrupted event.
+
+    python benchmarks/mock_server.py [--port 8765] [--latency-ms 300] [--reply-s 2] [--chunk-ms 40]
+
+Point GeminiConnection at it with {"endpoint": "ws://localhost:8765"}.
+"""
+import argparse
+import asyncio
+import base64
+import json
+import time
+
+import numpy as np
+import websockets
+
+OUTPUT_RATE = 24000
+
+
+def synthetic_reply(seconds, rate=OUTPUT_RATE):
+    """A voiced-sounding tone with a syllable-rate envelope, int16 PCM bytes"""
+    t = np.arange(int(seconds * rate)) / rate
+    signal = sum(np.sin(2 * np.pi * f * t) / (i + 1) for i, f in enumerate((140, 280, 420, 840)))
+    envelope = 0.3 + 0.7 * np.abs(np.sin(2 * np.pi * 3 * t))
+    return (signal / 2 * envelope * 12000).astype(np.int16).tobytes()
+
+
+class MockSessionStats:
+    """Counters for one client connection"""
+    def __init__(self):
+        self.connected_at = time.perf_counter()
+        self.messages_in = 0
+        self.audio_bytes_in = 0
+        self.image_messages_in = 0
+        self.messages_out = 0
+        self.turns = 0
+        self.interruptions = 0
+        self.stream_ends = 0
+        self.response_latencies = []
+
+    def summary(self):
+        elapsed = time.perf_counter() - self.connected_at
+        return {
+            "seconds": elapsed,
+            "messages_in": self.messages_in,
+            "messages_in_per_s": self.messages_in / elapsed if elapsed else 0.0,
+            "audio_bytes_in": self.audio_bytes_in,
+            "image_messages_in": self.image_messages_in,
+            "messages_out": self.messages_out,
+            "turns": self.turns,
+            "interruptions": self.interruptions,
+            "stream_ends": self.stream_ends
+        }
+
+
+class MockGeminiServer:
+    """Serves mock Live API sessions; one MockSessionStats per connection in sessions
+
+    latency: seconds from detected end of user speech to the first reply chunk
+    reply_seconds: length of each reply; chunk_ms: audio per serverContent message
+    stream_rate: how much faster than real time reply chunks are sent
+    speech_threshold: int16 RMS above which input audio counts as speech
+    end_of_speech_ms: received silence that ends an utterance; if the client
+    stops sending audio instead, only audio_stream_end ends it
+    """
+    def __init__(self, latency=0.3, reply_seconds=2.0, chunk_ms=40, stream_rate=4.0,
+                 speech_threshold=300, end_of_speech_ms=500):
+        self.latency = latency
+        self.chunk_bytes = int(OUTPUT_RATE * chunk_ms / 1000) * 2
+        self.stream_rate = stream_rate
+        self.chunk_seconds = chunk_ms / 1000
+        self.speech_threshold = speech_threshold
+        self.end_of_speech = end_of_speech_ms / 1000
+        self.sessions = []
+
+        # Pre-encode every reply message so the server is never the bottleneck
+        reply = synthetic_reply(reply_seconds)
+        self._reply_messages = [
+            json.dumps({
+                "serverContent": {
+                    "modelTurn": {
+                        "parts": [{
+                            "inlineData": {
+                                "mimeType": f"audio/pcm;rate={OUTPUT_RATE}",
+                                "data": base64.b64encode(reply[i:i + self.chunk_bytes]).decode()
+                            }
+                        }]
+                    }
+                }
+            })
+            for i in range(0, len(reply), self.chunk_bytes)
+        ]
+
+    async def handler(self, ws, path=None):
+        stats = MockSessionStats()
+        self.sessions.append(stats)
+        setup = json.loads(await ws.recv())
+        if "setup" not in setup:
+            await ws.close(1008, "expected setup")
+            return
+        await ws.send(json.dumps({"setupComplete": {}}))
+
+        in_speech = False
+        last_speech = 0.0
+        reply_task = None
+
+        async def reply(ended_at):
+            await asyncio.sleep(self.latency)
+            stats.turns += 1
+            stats.response_latencies.append(time.perf_counter() - ended_at)
+            start = time.perf_counter()
+            for i, message in enumerate(self._reply_messages):
+                await ws.send(message)
+                stats.messages_out += 1
+                due = start + (i + 1) * self.chunk_seconds / self.stream_rate
+                await asyncio.sleep(max(0.0, due - time.perf_counter()))
+            await ws.send(json.dumps({"serverContent": {"turnComplete": True}}))
+            stats.messages_out += 1
+
+        def end_of_speech():
+            nonlocal in_speech, reply_task
+            in_speech = False
+            reply_task = asyncio.create_task(reply(last_speech))
+
+        try:
+            async for msg in ws:
+                message = json.loads(msg)
+                stats.messages_in += 1
+                realtime_input = message.get("realtime_input", {})
+                if realtime_input.get("audio_stream_end"):
+                    # The client paused its mic stream (silence suppression)
+                    stats.stream_ends += 1
+                    if in_speech:
+                        end_of_speech()
+                    continue
+                for chunk in realtime_input.get("media_chunks", []):
+                    if not chunk.get("mime_type", "").startswith("audio/"):
+                        stats.image_messages_in += 1
+                        continue
+                    pcm = np.frombuffer(base64.b64decode(chunk["data"]), dtype=np.int16)
+                    stats.audio_bytes_in += pcm.nbytes
+                    now = time.perf_counter()
+                    if not len(pcm) or np.sqrt(np.mean(pcm.astype(np.float32) ** 2)) < self.speech_threshold:
+                        if in_speech and now - last_speech >= self.end_of_speech:
+                            end_of_speech()
+                        continue
+                    last_speech = now
+                    if in_speech:
+                        continue
+                    in_speech = True
+                    if reply_task and not reply_task.done():
+                        reply_task.cancel()
+                        stats.interruptions += 1
+                        await ws.send(json.dumps({"serverContent": {"interrupted": True}}))
+                        stats.messages_out += 1
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            if reply_task:
+                reply_task.cancel()
+
+    async def serve(self, host="localhost", port=8765):
+        """Start listening; returns the websockets server (port 0 picks a free port)"""
+        return await websockets.serve(self.handler, host, port, max_size=None)
+
+
+async def run(args):
+    server = MockGeminiServer(
+        latency=args.latency_ms / 1000,
+        reply_seconds=args.reply_s,
+        chunk_ms=args.chunk_ms,
+        stream_rate=args.stream_rate
+    )
+    ws_server = await server.serve(args.host, args.port)
+    print(f"Mock Gemini server listening on ws://{args.host}:{args.port}", flush=True)
+    try:
+        await asyncio.Future()
+    finally:
+        ws_server.close()
+        for number, stats in enumerate(server.sessions, 1):
+            print(f"Session {number}: {stats.summary()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=300, help="end of speech to first reply chunk")
+    parser.add_argument("--reply-s", type=float, default=2.0, help="length of each reply")
+    parser.add_argument("--chunk-ms", type=float, default=40, help="audio per serverContent message")
+    parser.add_argument("--stream-rate", type=float, default=4.0, help="reply send speed relative to real time")
+    args = parser.parse_args()
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from metrics import StageTimings
+from resampler import Resampler
+
+
+class EchoCanceller:
+    """Acoustic echo canceller using the played-back audio as far-end reference
+
+    Playback is resampled to the mic rate and queued by push_reference()
+    from the output callback; process() removes its echo from each mic
+    frame with a partitioned-block frequency-domain NLMS filter
+    (overlap-save, FFT size 2 * frame). partitions * frame samples of echo
+    path (128 ms by default) are modelled, which also absorbs the
+    playback/capture latency offset. The step is normalized by the far-end
+    power summed over partitions, regularized relative to its mean so bins
+    a tonal far end leaves empty stay stable. Adaptation freezes during
+    double talk (Geigel detector), and the filter is bypassed while nothing
+    has played for a full filter length. A frame whose output would carry
+    more energy than the mic is passed through unchanged; at twice the
+    energy the filter is reset.
+
+    Reference and mic are paired by order, so every captured mic frame
+    must go through either process() or skip().
+    """
+    def __init__(self, frame_size=512, mic_rate=16000, playback_rate=24000, partitions=4,
+                 step_size=0.2, max_reference_ms=500, double_talk_ratio=0.6, regularization=0.1):
+        self.frame_size = frame_size
+        self.partitions = partitions
+        self.step_size = step_size
+        self.double_talk_ratio = double_talk_ratio
+        self.regularization = regularization
+        self.resampler = Resampler(playback_rate, mic_rate)
+
+        bins = frame_size + 1
+        self._weights = np.zeros((partitions, bins), dtype=np.complex64)
+        self._far_spectra = np.zeros((partitions, bins), dtype=np.complex64)
+        self._far_power = np.full(bins, 1e-6, dtype=np.float32)
+        self._last_far = np.zeros(frame_size, dtype=np.float32)
+        self._far_peaks = deque([0.0] * partitions, maxlen=partitions)
+        self._idle_frames = partitions
+
+        self._reference = deque()
+        self._reference_size = 0
+        self._max_reference = int(mic_rate * max_reference_ms / 1000)
+        self._lock = threading.Lock()
+        # process() may run on a VAD worker thread while skip() runs on the loop
+        self._filter_lock = threading.Lock()
+
+        self.timings = StageTimings()
+        self.frames_processed = 0
+        self.double_talk_frames = 0
+        self.divergence_resets = 0
+
+    def push_reference(self, data: bytes):
+        """Queue played-back int16 audio as far-end reference (output callback thread)"""
+        samples = np.frombuffer(data, dtype=np.int16).astype(np.float32) * (1 / 32768)
+        resampled = self.resampler.process(samples)
+        with self._lock:
+            self._reference.append(resampled)
+            self._reference_size += len(resampled)
+            while self._reference_size - len(self._reference[0]) >= self._max_reference:
+                self._reference_size -= len(self._reference.popleft())
+
+    def _next_reference(self):
+        """Pop frame_size far-end samples, zero-padded if playback fell behind"""
+        far = np.zeros(self.frame_size, dtype=np.float32)
+        filled = 0
+        with self._lock:
+            while filled < self.frame_size and self._reference:
+                block = self._reference[0]
+                take = min(len(block), self.frame_size - filled)
+                far[filled:filled + take] = block[:take]
+                filled += take
+                if take == len(block):
+                    self._reference.popleft()
+                else:
+                    self._reference[0] = block[take:]
+                self._reference_size -= take
+        return far
+
+    def _advance(self, far):
+        """Shift a far-end block into the filter input history"""
+        far_peak = float(np.abs(far).max())
+        self._far_peaks.append(far_peak)
+        self._idle_frames = 0 if far_peak > 1e-4 else self._idle_frames + 1
+        # Overlap-save input: previous and current block
+        self._far_spectra[1:] = self._far_spectra[:-1]
+        if self._idle_frames >= 2:
+            self._far_spectra[0] = 0
+        else:
+            self._far_spectra[0] = np.fft.rfft(np.concatenate((self._last_far, far)))
+        self._last_far[:] = far
+
+    def skip(self):
+        """Consume the reference for a mic frame that is not processed
+
+        Keeps reference and mic aligned while frames bypass process(), e.g.
+        while input is ignored during playback or the session reconnects.
+        """
+        far = self._next_reference()
+        with self._filter_lock:
+            self._advance(far)
+
+    def process(self, data: bytes) -> bytes:
+        """Return the mic frame (int16 PCM) with the playback echo removed"""
+        start = time.perf_counter()
+        far = self._next_reference()
+        with self._filter_lock:
+            out = self._filter(data, far)
+        self.timings.record("aec", time.perf_counter() - start)
+        return out
+
+    def _filter(self, data, far):
+        self._advance(far)
+        if self._idle_frames >= self.partitions or len(data) != 2 * self.frame_size:
+            # No echo can be present; keep the frame and skip all filtering
+            return data
+
+        near = np.frombuffer(data, dtype=np.int16).astype(np.float32) * (1 / 32768)
+        n = self.frame_size
+        echo_spectrum = np.einsum("pk,pk->k", self._weights, self._far_spectra)
+        echo = np.fft.irfft(echo_spectrum, 2 * n)[n:]
+        error = near - echo
+
+        # Far-end power summed over all partitions, for normalization
+        power = np.sum(self._far_spectra.real ** 2 + self._far_spectra.imag ** 2, axis=0)
+        self._far_power *= 0.7
+        self._far_power += 0.3 * power
+
+        # Divergence guard: never output more energy than the mic picked up,
+        # and start over once the filter adds more than it removes
+        near_energy = float(np.dot(near, near))
+        error_energy = float(np.dot(error, error))
+        if error_energy > 2 * near_energy + 1e-6:
+            self._weights[:] = 0
+            self.divergence_resets += 1
+            self.frames_processed += 1
+            return data
+
+        # Geigel double-talk detector: near end much louder than recent far end
+        double_talk = float(np.abs(near).max()) > self.double_talk_ratio * max(self._far_peaks) + 1e-3
+        if double_talk:
+            self.double_talk_frames += 1
+        else:
+            # Regularize relative to the mean power, so bins a tonal or
+            # speech far end leaves empty do not get a huge step
+            regularized = self._far_power + self.regularization * self._far_power.mean() + 1e-6
+            error_spectrum = np.fft.rfft(np.concatenate((np.zeros(n, dtype=np.float32), error)))
+            gradient = np.conj(self._far_spectra) * (error_spectrum / regularized)
+            # Gradient constraint: keep each partition's impulse response causal
+            constrained = np.fft.irfft(gradient, 2 * n, axis=1)
+            constrained[:, n:] = 0
+            self._weights += self.step_size * np.fft.rfft(constrained, axis=1)
+
+        self.frames_processed += 1
+        if error_energy > near_energy:
+            return data
+        return np.clip(error * 32768, -32768, 32767).astype(np.int16).tobytes()
+
+    def reset(self):
+        with self._filter_lock:
+            self._weights[:] = 0
+            self._far_spectra[:] = 0
+            self._last_far[:] = 0
+        with self._lock:
+            self._reference.clear()
+            self._reference_size = 0
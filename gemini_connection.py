@@ -1,14 +1,38 @@
 import asyncio
 import os
+import threading
+import time
+from collections import deque
 import json
 import base64
 import pyaudio
+import websockets
 from websockets import connect
 from concurrent.futures import CancelledError
-from voice_activity_detector import VoiceActivityDetector
+from voice_activity_detector import VoiceActivityDetector, VADResult, VADWorker
+from audio_pipeline import (
+    AudioPacketizer, BargeInController, CaptureRing, JitterBuffer, PlaybackScheduler,
+    SilenceSuppressor
+)
+from metrics import DEPTH_BUCKETS, LoopLagMonitor, PipelineMetrics
+from echo_canceller import EchoCanceller
+from resampler import CaptureConverter, PlaybackConverter
+from message_encoder import MediaChunkEncoder, dumps, loads
+from video_capture import AdaptiveVideoController, VideoCaptureWorker
+
+# Marker queued after a turn's (audio, received_at) chunks in audio_queue
+TURN_COMPLETE = object()
+
+# Tells the server the mic stream paused (silence suppression), so its
+# activity detection ends the user's turn without waiting for more audio
+AUDIO_STREAM_END = dumps({"realtime_input": {"audio_stream_end": True}}).encode()
+
+# websockets >= 14 can send a bytes payload as a text frame without decoding it
+WS_SEND_BYTES_AS_TEXT = int(websockets.__version__.split(".")[0]) >= 14
 
 class GeminiConnection:
-    def __init__(self, config=None, cleanup_event=None, on_connect=None, video_capture=None):
+    def __init__(self, config=None, cleanup_event=None, on_connect=None, video_capture=None, preconnect=False,
+                 audio=None, vad_executor=None):
         self.api_key = os.environ.get("GEMINI_API_KEY")
         if not self.api_key:
             raise ValueError("GEMINI_API_KEY environment variable is not set")
@@ -20,17 +44,35 @@ class GeminiConnection:
             "video_mode": "none"
         }
         
-        self.uri = (
+        # "endpoint" points the session at another server, e.g. the local mock
+        self.uri = self.config.get("endpoint") or (
             "wss://generativelanguage.googleapis.com/ws/"
             "google.ai.generativelanguage.v1alpha.GenerativeService.BidiGenerateContent"
             f"?key={self.api_key}"
         )
         
         self.ws = None
-        self.vad = VoiceActivityDetector()
+        # A PyAudio instance shared with other sessions (not terminated
+        # here); None creates one per stream
+        self.shared_audio = audio
+        # With preconnect, start() connects and sets up the session, then
+        # waits for activate() before opening audio devices
+        self.activated = threading.Event()
+        if not preconnect:
+            self.activated.set()
+        self.resumption_handle = None
+        self.reconnects = 0
+        self.vad = VoiceActivityDetector(
+            model_path=self.config.get("vad_model_path"),
+            offline=self.config.get("vad_offline")
+        )
         self.equalizer = None
         self.video_capture = video_capture
         self.audio_stream = None
+        self.capture_ring = None
+        self.capture_converter = None
+        self.playback_converter = None
+        self._capture_backlog = deque()
 
         # Audio settings
         self.FORMAT = pyaudio.paInt16
@@ -38,13 +80,99 @@ class GeminiConnection:
         self.INPUT_RATE = 16000
         self.OUTPUT_RATE = 24000
         self.CHUNK = 512
+        self.OUTPUT_CHUNK = 480  # 20 ms at 24 kHz
+        self.device_chunk = self.CHUNK  # mic frames per read at the device rate
 
         self.audio_queue = asyncio.Queue()
-        self.is_playing = False
+        # Received audio is played from a jitter buffer by the output stream callback
+        self.bytes_per_ms = bytes_per_ms = self.OUTPUT_RATE * 2 * self.CHANNELS // 1000
+        self.jitter_buffer = JitterBuffer(
+            capacity_bytes=self.config.get("playback_buffer_s", 120) * 1000 * bytes_per_ms,
+            target_bytes=self.config.get("playback_target_ms", 100) * bytes_per_ms
+        )
+        self.playback = PlaybackScheduler(self.jitter_buffer, bytes_per_ms * 1000, on_finish=self._record_turn)
         self.running = True
         self.cleanup_event = cleanup_event
         self.on_connect = on_connect
-        self.allow_interruptions = config.get("allow_interruptions", False)
+        self.allow_interruptions = self.config.get("allow_interruptions", False)
+
+        # Local barge-in: duck or pause playback as soon as the user talks over it
+        self.barge_in = None
+        if self.allow_interruptions:
+            self.barge_in = BargeInController(
+                self.jitter_buffer,
+                mode=self.config.get("barge_in", "duck"),
+                duck_gain=self.config.get("barge_in_gain", 0.2),
+                resume_after=self.config.get("barge_in_resume_s", 1.5)
+            )
+
+        # Echo cancellation: remove our own playback from the mic signal
+        # before VAD, so speaker setups can be interrupted without headsets
+        self.echo_canceller = None
+        if self.config.get("echo_cancellation", False):
+            self.echo_canceller = EchoCanceller(
+                frame_size=self.CHUNK,
+                mic_rate=self.INPUT_RATE,
+                playback_rate=self.OUTPUT_RATE,
+                partitions=self.config.get("aec_partitions", 4)
+            )
+
+        # VAD inference runs on a worker thread unless vad_worker is disabled,
+        # in which case it runs inline on the event loop
+        self.vad_results = asyncio.Queue()
+        self.vad_worker = None
+        if self.config.get("vad_worker", True):
+            self.vad_worker = VADWorker(
+                self.vad,
+                maxsize=self.config.get("vad_queue_size", 16),
+                preprocess=self.echo_canceller.process if self.echo_canceller else None,
+                executor=vad_executor
+            )
+        # Disable loop_lag_monitor when a host (SessionManager) monitors the
+        # shared loop once for all sessions
+        self.loop_lag = None
+        if self.config.get("loop_lag_monitor", True):
+            self.loop_lag = LoopLagMonitor()
+
+        # Per-stage latency histograms (ms) and queue depths; capture and
+        # VAD-submit times of in-flight frames are matched up in send_audio
+        # by order, since frames are processed FIFO
+        self.metrics = PipelineMetrics()
+        for name in ("capture_queue_depth", "vad_queue_depth", "audio_queue_depth"):
+            self.metrics.histogram(name, DEPTH_BUCKETS)
+        self.metrics.histogram("playback_buffer_ms", description="Buffered playback audio when a chunk is written")
+        self.metrics.histogram("time_to_first_audio_ms", description="End of user speech to first audible model audio")
+        self._frame_times = deque()
+        self._last_captured_at = None
+        self._tasks = []
+
+        # Pre-templated encoder for realtime_input audio messages
+        self.audio_encoder = MediaChunkEncoder("audio/pcm")
+
+        # Coalesce mic chunks into larger packets; audio_packet_ms <= chunk
+        # length sends every chunk as its own message
+        self.packetizer = None
+        packet_ms = self.config.get("audio_packet_ms", 64)
+        if packet_ms > self.CHUNK * 1000 / self.INPUT_RATE:
+            self.packetizer = AudioPacketizer(
+                packet_bytes=int(self.INPUT_RATE * packet_ms / 1000) * 2,
+                max_delay=self.config.get("audio_max_delay_ms", 100) / 1000
+            )
+
+        # Silence suppression: stop sending audio between utterances
+        self.silence_suppressor = None
+        if self.config.get("silence_suppression", False):
+            chunk_ms = self.CHUNK * 1000 / self.INPUT_RATE
+            self.silence_suppressor = SilenceSuppressor(
+                chunk_ms,
+                pre_roll_ms=self.config.get("pre_roll_ms", 300),
+                hangover_ms=self.config.get("hangover_ms", 500)
+            )
+
+    @property
+    def is_playing(self):
+        """True while Gemini audio is being played out"""
+        return self.jitter_buffer.is_playing
 
     def set_equalizer(self, equalizer):
         """Set the equalizer for visual feedback"""
@@ -53,6 +181,11 @@ class GeminiConnection:
     async def cleanup(self):
         """Clean up resources"""
         self.running = False
+        if self.loop_lag:
+            print(self.loop_lag.format_summary())
+        print(self.metrics.format_summary())
+        if self.config.get("metrics_dir"):
+            self._write_metrics()
         if self.ws:
             try:
                 await self.ws.close()
@@ -66,72 +199,105 @@ class GeminiConnection:
             except Exception as e:
                 print(f"Error closing audio stream: {e}")
 
-    async def start(self):
-        try:
-            self.ws = await connect(self.uri)
-            
-            generation_config = {
-                "response_modalities": ["AUDIO"],
-                "speech_config": {
-                    "voice_config": {
-                        "prebuilt_voice_config": {
-                            "voice_name": self.config.get("voice", "Kore")
-                        }
-                    }
-                },
-                "temperature": self.config.get("temperature", 0.7),
-                "top_p": self.config.get("top_p", 0.95),
-                "top_k": self.config.get("top_k", 40)
-            }
-            
-            setup_message = {
-                "setup": {
-                    "model": f"models/{self.model}",
-                    "generation_config": generation_config,
-                    "system_instruction": {
-                        "parts": [
-                            {
-                                "text": self.config.get("system_prompt", "")
-                            }
-                        ]
+    def activate(self):
+        """Start audio/video on a pre-connected session (any thread)"""
+        self.activated.set()
+
+    def _setup_message(self):
+        generation_config = {
+            "response_modalities": ["AUDIO"],
+            "speech_config": {
+                "voice_config": {
+                    "prebuilt_voice_config": {
+                        "voice_name": self.config.get("voice", "Kore")
                     }
                 }
-            }
-                
-            setup_message = {
-                "setup": {
-                    "model": f"models/{self.model}",
-                    "generation_config": generation_config,
-                    "system_instruction": {
-                        "parts": [
-                            {
-                                "text": self.config.get("system_prompt", "")
-                            }
-                        ]
-                    }
+            },
+            "temperature": self.config.get("temperature", 0.7),
+            "top_p": self.config.get("top_p", 0.95),
+            "top_k": self.config.get("top_k", 40)
+        }
+
+        setup_message = {
+            "setup": {
+                "model": f"models/{self.model}",
+                "generation_config": generation_config,
+                "system_instruction": {
+                    "parts": [
+                        {
+                            "text": self.config.get("system_prompt", "")
+                        }
+                    ]
                 }
             }
-            
-            await self.ws.send(json.dumps(setup_message))
-            first_msg = await self.ws.recv()
-            
-            if not first_msg:
-                raise ConnectionError("Failed to receive initial message from Gemini")
-                
+        }
+        if self.config.get("session_resumption", False):
+            # Resume the server-side conversation after a reconnect
+            resumption = {"handle": self.resumption_handle} if self.resumption_handle else {}
+            setup_message["setup"]["session_resumption"] = resumption
+        return setup_message
+
+    async def connect_session(self):
+        """Open the websocket, send setup and wait for the server's reply"""
+        start = time.perf_counter()
+        ws = await connect(self.uri)
+        try:
+            await ws.send(dumps(self._setup_message()))
+            first_msg = await ws.recv()
+        except BaseException:
+            await ws.close()
+            raise
+
+        if not first_msg:
+            await ws.close()
+            raise ConnectionError("Failed to receive initial message from Gemini")
+
+        self.ws = ws
+        print(f"Session set up in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    def _ws_closed(self):
+        return self.ws is None or self.ws.close_code is not None
+
+    async def _wait_for_activation(self):
+        """Hold a pre-connected session until activate() or cleanup"""
+        while not self.activated.is_set():
+            if self.cleanup_event and self.cleanup_event.is_set():
+                self.running = False
+                return
+            await asyncio.sleep(0.05)
+        if self._ws_closed():
+            # Idle pre-connected session was dropped by the server
+            print("Pre-connected session closed, reconnecting")
+            await self.connect_session()
+
+    async def start(self):
+        try:
+            await self.connect_session()
+            await self._wait_for_activation()
+            if not self.running:
+                return
+
             print("Connected to Gemini. Speak into your microphone.")
             
             if self.on_connect:
                 asyncio.get_event_loop().call_soon_threadsafe(self.on_connect)
             
             async with asyncio.TaskGroup() as tg:
-                tg.create_task(self.capture_audio())
+                self._tasks = [
+                    tg.create_task(self.capture_audio()),
+                    tg.create_task(self.send_audio())
+                ]
+                if self.loop_lag:
+                    self._tasks.append(tg.create_task(self.monitor_loop_lag()))
+                if self.config.get("metrics_dir"):
+                    self._tasks.append(tg.create_task(self.export_metrics()))
                 
                 if self.video_capture and self.config.get("video_mode") != "none":
-                    tg.create_task(self.capture_video())
+                    self._tasks.append(tg.create_task(self.capture_video()))
                     
-                tg.create_task(self.receive_server_messages())
-                tg.create_task(self.play_responses())
-                tg.create_task(self.watch_cleanup())
+                self._tasks.append(tg.create_task(self.receive_server_messages()))
+                self._tasks.append(tg.create_task(self.play_responses()))
+                self._tasks.append(tg.create_task(self.watch_cleanup()))
 
         except Exception as e:
             print(f"Error in Gemini connection: {e}")
@@ -139,46 +305,115 @@ class GeminiConnection:
         finally:
             await self.cleanup()
 
-    async def capture_video(self):
-        """Capture and send video frames to Gemini"""
-        while self.running:
+    async def reconnect(self):
+        """Re-establish the session with exponential backoff, keeping audio devices open
+
+        Raises ConnectionError once reconnect_max_attempts attempts fail.
+        """
+        self.ws = None
+        delay = self.config.get("reconnect_initial_delay_s", 0.5)
+        max_delay = self.config.get("reconnect_max_delay_s", 30.0)
+        attempts = self.config.get("reconnect_max_attempts", 8)
+        for attempt in range(1, attempts + 1):
+            if not self.running:
+                return
+            print(f"Reconnecting to Gemini (attempt {attempt}/{attempts}) in {delay:.1f}s")
+            await asyncio.sleep(delay)
             try:
-                if not self.video_capture:
-                    break
-                    
-                frame = self.video_capture.get_frame()
-                if frame:
-                    msg = {
-                        "realtime_input": {
-                            "media_chunks": [frame]
-                        }
-                    }
-                    if self.ws:
-                        await self.ws.send(json.dumps(msg))
-                await asyncio.sleep(1.0)  # Capture every second
-            except Exception as e:
-                print(f"Error capturing video: {e}")
-                await asyncio.sleep(1.0)
+                await self.connect_session()
+            except (OSError, asyncio.TimeoutError, websockets.WebSocketException, ConnectionError) as e:
+                print(f"Reconnect failed: {e}")
+                delay = min(delay * 2, max_delay)
+                continue
+            self.reconnects += 1
+            print("Reconnected to Gemini")
+            return
+        raise ConnectionError(f"Could not reconnect to Gemini after {attempts} attempts")
+
+    async def capture_video(self):
+        """Send frames produced by the video capture worker to Gemini"""
+        if not self.video_capture:
+            return
+
+        interval = self.config.get("video_interval", 1.0)
+        worker = VideoCaptureWorker(self.video_capture, interval=interval)
+        controller = None
+        if self.config.get("adaptive_video", True):
+            controller = AdaptiveVideoController(
+                target_bitrate=self.config.get("video_target_bitrate", 800_000),
+                min_interval=interval
+            )
+            controller.apply(self.video_capture, worker)
+        worker.start()
+        try:
+            while self.running:
+                payload = await worker.slot.get()
+                # A dropped frame must not count as sent, or a static
+                # picture would not be sent again until the next keyframe
+                if self._ws_closed():
+                    self.video_capture.frame_dropped()
+                    continue
+                if controller and controller.should_drop(self._ws_buffered_bytes()):
+                    self.video_capture.frame_dropped()
+                    controller.apply(self.video_capture, worker)
+                    continue
+                try:
+                    start = time.perf_counter()
+                    await self._send_encoded(payload)
+                    send_time = time.perf_counter() - start
+                except Exception as e:
+                    print(f"Error sending video frame: {e}")
+                    self.video_capture.frame_dropped()
+                    continue
+                if controller:
+                    controller.update(len(payload), send_time, self._ws_buffered_bytes())
+                    controller.apply(self.video_capture, worker)
+        finally:
+            await asyncio.to_thread(worker.stop)
+            print(worker.timings.format_summary("Video"))
+            print(f"Video: {self.video_capture.frames_skipped} unchanged frames skipped")
+            if controller:
+                print(f"Video: {controller.frames_dropped} frames dropped for congestion, final {controller}")
+
+    def _ws_buffered_bytes(self):
+        """Bytes queued in the websocket transport but not yet written to the socket"""
+        transport = getattr(self.ws, "transport", None)
+        if transport is None:
+            return 0
+        try:
+            return transport.get_write_buffer_size()
+        except Exception:
+            return 0
 
     async def capture_audio(self):
         """Capture audio from microphone and send to Gemini"""
-        audio = pyaudio.PyAudio()
+        audio = self.shared_audio or pyaudio.PyAudio()
         try:
-            self.audio_stream = audio.open(
-                format=self.FORMAT,
-                channels=self.CHANNELS,
-                rate=self.INPUT_RATE,
-                input=True,
-                frames_per_buffer=self.CHUNK
-            )
+            callback = None
+            if self.config.get("capture_mode", "callback") == "callback":
+                self.capture_ring = CaptureRing(
+                    asyncio.get_running_loop(),
+                    max_frames=self.config.get("capture_ring_frames", 64)
+                )
+                callback = self._capture_callback
+            self.audio_stream = self._open_input(audio, callback)
+            if callback:
+                self.audio_stream.start_stream()
+            if self.vad_worker:
+                self.vad_worker.start(self.vad_results)
+            else:
+                self.vad.reset()
 
             while self.running:
                 try:
-                    data = await asyncio.to_thread(
-                        self.audio_stream.read, 
-                        self.CHUNK, 
-                        exception_on_overflow=False
-                    )
+                    if self.capture_ring is not None:
+                        data = await self.capture_ring.get()
+                        captured_at = self.capture_ring.last_captured_at
+                        self.metrics.observe("capture_wait_ms", (time.perf_counter() - captured_at) * 1000)
+                        self.metrics.observe("capture_queue_depth", len(self.capture_ring))
+                    else:
+                        data = await asyncio.to_thread(self._read_input_frame)
+                        captured_at = time.perf_counter()
                     
                     if self.equalizer:
                         self.equalizer.update_levels(data)
@@ -188,26 +423,17 @@ class GeminiConnection:
                     )
 
                     if should_process and self.ws:
-                        if not self.vad.is_speech(data):
-                            if not hasattr(self, '_printed_no_speech'):
-                                print("No speech detected")
-                                self._printed_no_speech = True
-                            data = b'\x00' * len(data)
+                        self._frame_times.append((captured_at, time.perf_counter()))
+                        if self.vad_worker:
+                            await self.vad_worker.submit(data)
                         else:
-                            self._printed_no_speech = False
-                        
-                        msg = {
-                            "realtime_input": {
-                                "media_chunks": [
-                                    {
-                                        "data": base64.b64encode(data).decode(),
-                                        "mime_type": "audio/pcm"
-                                    }
-                                ]
-                            }
-                        }
-                        await self.ws.send(json.dumps(msg))
+                            if self.echo_canceller:
+                                data = self.echo_canceller.process(data)
+                            self.vad_results.put_nowait((data, self.vad.push(data)))
                     else:
+                        if self.echo_canceller:
+                            # Keep the playback reference aligned with the mic
+                            self.echo_canceller.skip()
                         if not hasattr(self, '_printed_skip_message'):
                             print("Skipping input while Gemini is speaking")
                             self._printed_skip_message = True
@@ -224,71 +450,278 @@ class GeminiConnection:
         except Exception as e:
             print(f"Unexpected error in capture_audio: {e}")
         finally:
+            if self.capture_ring is not None:
+                print(
+                    f"Capture: {self.capture_ring.overflows} ring overflows, "
+                    f"{self.capture_ring.device_overflows} device overflows"
+                )
             if self.audio_stream:
                 try:
                     self.audio_stream.stop_stream()
                     self.audio_stream.close()
                 except:
                     pass
+            if not self.shared_audio:
+                try:
+                    audio.terminate()
+                except:
+                    pass
+            # Last: the device is already closed if this await is cancelled
+            if self.vad_worker:
+                await self.vad_worker.stop_async()
+            if self.echo_canceller:
+                print(self.echo_canceller.timings.format_summary("Echo canceller"))
+
+    def _device_info(self, audio, kind):
+        """PyAudio info for the configured (or default) input/output device"""
+        index = self.config.get(f"{kind}_device_index")
+        if index is not None:
+            return audio.get_device_info_by_index(index)
+        if kind == "input":
+            return audio.get_default_input_device_info()
+        return audio.get_default_output_device_info()
+
+    def _open_input(self, audio, callback=None):
+        """Open the mic at its native rate and channel count, converting in-process
+
+        Frames reaching the rest of the pipeline are always CHUNK samples of
+        mono int16 at INPUT_RATE. With native_device_rate disabled (or a
+        device that is already 16 kHz mono) the stream is opened as such.
+        """
+        info = self._device_info(audio, "input")
+        rate = int(info["defaultSampleRate"])
+        channels = max(1, min(int(info["maxInputChannels"]), 2))
+        self.capture_converter = None
+        if not self.config.get("native_device_rate", True) or (rate == self.INPUT_RATE and channels == 1):
+            rate, channels, sample_format, chunk = self.INPUT_RATE, self.CHANNELS, self.FORMAT, self.CHUNK
+        else:
+            sample_format = pyaudio.paFloat32
+            chunk = round(self.CHUNK * rate / self.INPUT_RATE)
+            self.capture_converter = CaptureConverter(rate, channels, self.INPUT_RATE, self.CHUNK)
+        print(f"Microphone: {info['name']} at {rate} Hz, {channels} channel(s)")
+        self.device_chunk = chunk
+        self._capture_backlog.clear()
+        return audio.open(
+            format=sample_format,
+            channels=channels,
+            rate=rate,
+            input=True,
+            input_device_index=info["index"],
+            frames_per_buffer=chunk,
+            stream_callback=callback
+        )
+
+    def _open_output(self, audio):
+        """Open the speaker at its native rate and channel count, converting in-process"""
+        info = self._device_info(audio, "output")
+        rate = int(info["defaultSampleRate"])
+        channels = max(1, min(int(info["maxOutputChannels"]), 2))
+        self.playback_converter = None
+        if not self.config.get("native_device_rate", True) or (rate == self.OUTPUT_RATE and channels == 1):
+            rate, channels, sample_format, chunk = self.OUTPUT_RATE, self.CHANNELS, self.FORMAT, self.OUTPUT_CHUNK
+        else:
+            sample_format = pyaudio.paFloat32
+            chunk = round(self.OUTPUT_CHUNK * rate / self.OUTPUT_RATE)
+            self.playback_converter = PlaybackConverter(rate, channels, self.OUTPUT_RATE)
+        print(f"Speaker: {info['name']} at {rate} Hz, {channels} channel(s)")
+        return audio.open(
+            format=sample_format,
+            channels=channels,
+            rate=rate,
+            output=True,
+            output_device_index=info["index"],
+            frames_per_buffer=chunk,
+            stream_callback=self._playback_callback
+        )
+
+    def _read_input_frame(self):
+        """Blocking read of the next CHUNK-sample frame (runs in a worker thread)"""
+        while not self._capture_backlog:
+            data = self.audio_stream.read(self.device_chunk, exception_on_overflow=False)
+            if not self.capture_converter:
+                return data
+            self._capture_backlog.extend(self.capture_converter.process(data))
+        return self._capture_backlog.popleft()
+
+    def _capture_callback(self, in_data, frame_count, time_info, status):
+        """PyAudio input callback, runs on the PortAudio thread"""
+        overflow = bool(status & pyaudio.paInputOverflow)
+        if not self.capture_converter:
+            self.capture_ring.push(in_data, device_overflow=overflow)
+            return (None, pyaudio.paContinue)
+        for frame in self.capture_converter.process(in_data):
+            self.capture_ring.push(frame, device_overflow=overflow)
+            overflow = False
+        return (None, pyaudio.paContinue)
+
+    async def send_audio(self):
+        """Send VAD-gated microphone audio to Gemini"""
+        if self.silence_suppressor:
+            self.silence_suppressor.reset()
+
+        while self.running:
+            timeout = self.packetizer.time_until_due() if self.packetizer else None
             try:
-                audio.terminate()
-            except:
-                pass
+                data, vad_result = await asyncio.wait_for(self.vad_results.get(), timeout)
+            except asyncio.TimeoutError:
+                # Latency budget expired with no new frames
+                await self._send_audio_packet(self.packetizer.flush())
+                continue
 
-    async def receive_server_messages(self):
-        """Receive and process messages from Gemini"""
-        if not self.ws:
+            if self._frame_times:
+                self._last_captured_at, submitted_at = self._frame_times.popleft()
+                self.metrics.observe("vad_ms", (time.perf_counter() - submitted_at) * 1000)
+            self.metrics.observe("vad_queue_depth", self.vad_results.qsize())
+
+            if vad_result.event == VADResult.SPEECH_START:
+                print(f"Speech started (p={vad_result.probability:.2f})")
+                if self.barge_in:
+                    self.barge_in.on_user_speech_start()
+            elif vad_result.event == VADResult.SPEECH_END:
+                print(f"Speech ended (p={vad_result.probability:.2f})")
+                self.playback.on_user_speech_end()
+                if self.barge_in:
+                    self.barge_in.on_user_speech_end()
+
+            if self.silence_suppressor:
+                was_paused = self.silence_suppressor.paused
+                data = self.silence_suppressor.process(data, vad_result.is_speech)
+                if not data:
+                    if self.packetizer:
+                        await self._send_audio_packet(self.packetizer.flush())
+                    if not was_paused:
+                        await self._send_audio_stream_end()
+                    continue
+            elif not vad_result.is_speech:
+                data = b'\x00' * len(data)
+
+            if self.packetizer:
+                data = self.packetizer.add(data, flush=vad_result.event == VADResult.SPEECH_END)
+
+            await self._send_audio_packet(data)
+
+    async def _send_audio_packet(self, data):
+        """Encode and send one packet of PCM audio"""
+        if not data or self._ws_closed():
+            return
+        try:
+            start = time.perf_counter()
+            payload = self.audio_encoder.encode(data)
+            encoded = time.perf_counter()
+            await self._send_encoded(payload)
+            sent = time.perf_counter()
+        except Exception as e:
+            print(f"Error sending audio: {e}")
             return
+        self.metrics.observe("encode_ms", (encoded - start) * 1000)
+        self.metrics.observe("send_ms", (sent - encoded) * 1000)
+        self.metrics.inc("audio_packets_sent")
+        self.metrics.inc("audio_bytes_sent", len(data))
+        if self._last_captured_at is not None:
+            # Capture of the newest frame in the packet to send completion
+            self.metrics.observe("uplink_ms", (sent - self._last_captured_at) * 1000)
+
+    async def _send_audio_stream_end(self):
+        if self._ws_closed():
+            return
+        try:
+            await self._send_encoded(AUDIO_STREAM_END)
+        except Exception as e:
+            print(f"Error sending end of audio: {e}")
+
+    async def _send_encoded(self, payload):
+        """Send a pre-encoded JSON message as a text frame"""
+        if WS_SEND_BYTES_AS_TEXT:
+            await self.ws.send(payload, text=True)
+        else:
+            await self.ws.send(str(payload, 'ascii'))
+
+    async def receive_server_messages(self):
+        """Receive and process messages from Gemini, reconnecting on drops"""
+        while self.running and self.ws:
+            try:
+                async for msg in self.ws:
+                    self.metrics.inc("messages_received")
+                    await self._handle_server_message(msg, time.perf_counter())
+            except websockets.ConnectionClosed as e:
+                print(f"Connection to Gemini lost: {e}")
+
+            if not self.running or not self.config.get("reconnect", True):
+                break
+            # Any turn in flight is lost with the connection; let what was
+            # received play out and close the turn
+            await self.audio_queue.put(TURN_COMPLETE)
+            await self.reconnect()
+
+    async def _handle_server_message(self, msg, received_at):
+        try:
+            response = loads(msg)
             
-        async for msg in self.ws:
             try:
-                response = json.loads(msg)
-                
-                try:
-                    parts = response["serverContent"].get("modelTurn", {}).get("parts", [])
-                    for p in parts:
-                        if "inlineData" in p:
-                            audio_data_b64 = p["inlineData"]["data"]
-                            audio_bytes = base64.b64decode(audio_data_b64)
-                            await self.audio_queue.put(audio_bytes)
-                        elif "text" in p:
-                            print("Gemini text response:", p["text"])
-                except KeyError:
-                    pass
+                parts = response["serverContent"].get("modelTurn", {}).get("parts", [])
+                for p in parts:
+                    if "inlineData" in p:
+                        audio_data_b64 = p["inlineData"]["data"]
+                        audio_bytes = base64.b64decode(audio_data_b64)
+                        self.metrics.inc("audio_bytes_received", len(audio_bytes))
+                        self.metrics.observe("decode_ms", (time.perf_counter() - received_at) * 1000)
+                        await self.audio_queue.put((audio_bytes, received_at))
+                    elif "text" in p:
+                        print("Gemini text response:", p["text"])
+            except KeyError:
+                pass
 
-                try:
-                    if response["serverContent"].get("turnComplete"):
-                        while not self.audio_queue.empty():
-                            await self.audio_queue.get()
-                except KeyError:
-                    pass
-                    
-            except json.JSONDecodeError as e:
-                print(f"Error decoding server message: {e}")
-            except Exception as e:
-                print(f"Error processing server message: {e}")
+            try:
+                if response["serverContent"].get("interrupted"):
+                    self.flush_playback()
+                if response["serverContent"].get("turnComplete"):
+                    # Queued behind the turn's audio so every chunk still plays
+                    await self.audio_queue.put(TURN_COMPLETE)
+            except KeyError:
+                pass
+
+            update = response.get("sessionResumptionUpdate")
+            if update and update.get("resumable") and update.get("newHandle"):
+                self.resumption_handle = update["newHandle"]
+            if "goAway" in response:
+                print(f"Server will close the connection: {response['goAway']}")
+                
+        except json.JSONDecodeError as e:
+            print(f"Error decoding server message: {e}")
+        except Exception as e:
+            print(f"Error processing server message: {e}")
 
     async def play_responses(self):
         """Play audio responses from Gemini"""
-        audio = pyaudio.PyAudio()
+        audio = self.shared_audio or pyaudio.PyAudio()
         stream = None
         try:
-            stream = audio.open(
-                format=self.FORMAT,
-                channels=self.CHANNELS,
-                rate=self.OUTPUT_RATE,
-                output=True
-            )
+            stream = self._open_output(audio)
+            stream.start_stream()
 
             while self.running:
+                # Poll while a turn is playing (or barge-in is engaged) so
+                # state changes are noticed promptly
+                polling = self.playback.active or (self.barge_in and self.barge_in.engaged)
                 try:
-                    audio_chunk = await self.audio_queue.get()
-                    self.is_playing = True
-                    await asyncio.to_thread(stream.write, audio_chunk)
-                    self.is_playing = False
-                except Exception as e:
-                    print(f"Error playing audio: {e}")
-                    await asyncio.sleep(0.1)
+                    item = await asyncio.wait_for(self.audio_queue.get(), 0.02 if polling else None)
+                except asyncio.TimeoutError:
+                    self.playback.poll()
+                    if self.barge_in:
+                        self.barge_in.poll()
+                    continue
+
+                if item is TURN_COMPLETE:
+                    self.playback.on_turn_complete()
+                else:
+                    chunk, received_at = item
+                    start = time.perf_counter()
+                    self.metrics.observe("audio_queue_wait_ms", (start - received_at) * 1000)
+                    self.metrics.observe("audio_queue_depth", self.audio_queue.qsize())
+                    self.metrics.observe("playback_buffer_ms", self.jitter_buffer.occupancy / self.bytes_per_ms)
+                    self.playback.on_audio(chunk)
+                    self.metrics.observe("playback_write_ms", (time.perf_counter() - start) * 1000)
+                    self.playback.poll()
                     
         except CancelledError:
             print("Playback cancelled")
@@ -301,15 +734,80 @@ class GeminiConnection:
                     stream.close()
                 except:
                     pass
-            try:
-                audio.terminate()
-            except:
-                pass
+            if not self.shared_audio:
+                try:
+                    audio.terminate()
+                except:
+                    pass
+            print(
+                f"Playback: {self.jitter_buffer.underruns} underruns, "
+                f"{self.jitter_buffer.overruns} overruns"
+            )
+            if self.barge_in:
+                print(
+                    f"Barge-in: {self.barge_in.confirmed} confirmed by server, "
+                    f"{self.barge_in.resumed} resumed"
+                )
+
+    def flush_playback(self):
+        """Drop all received audio that has not been played yet"""
+        while not self.audio_queue.empty():
+            self.audio_queue.get_nowait()
+        self.playback.on_interrupted()
+        if self.barge_in:
+            self.barge_in.on_interrupted()
+
+    def _playback_callback(self, in_data, frame_count, time_info, status):
+        """PyAudio output callback, runs on the PortAudio thread"""
+        if self.playback_converter:
+            return (self.playback_converter.read(frame_count, self._read_playback), pyaudio.paContinue)
+        return (self._read_playback(frame_count * 2 * self.CHANNELS), pyaudio.paContinue)
+
+    def _read_playback(self, nbytes):
+        """Pull OUTPUT_RATE mono audio for the device, feeding the echo canceller its reference"""
+        data = self.jitter_buffer.read(nbytes)
+        if self.echo_canceller:
+            self.echo_canceller.push_reference(data)
+        return data
+
+    def _record_turn(self, stats):
+        """PlaybackScheduler on_finish hook: add a finished turn to the latency histograms"""
+        self.metrics.inc("turns")
+        if stats["interrupted"]:
+            self.metrics.inc("turns_interrupted")
+        for name in ("time_to_first_audio_ms", "time_to_first_chunk_ms", "buffering_ms"):
+            if stats[name] is not None:
+                self.metrics.observe(name, stats[name])
+
+    async def export_metrics(self):
+        """Periodically write the metrics snapshot to metrics_dir"""
+        interval = self.config.get("metrics_interval_s", 10.0)
+        next_write = time.monotonic() + interval
+        while self.running:
+            await asyncio.sleep(0.5)
+            if time.monotonic() >= next_write:
+                await asyncio.to_thread(self._write_metrics)
+                next_write = time.monotonic() + interval
+
+    def _write_metrics(self):
+        try:
+            self.metrics.write(self.config["metrics_dir"])
+        except OSError as e:
+            print(f"Error writing metrics: {e}")
+
+    async def monitor_loop_lag(self):
+        """Measure how long the event loop is blocked during the session"""
+        await self.loop_lag.run(lambda: self.running)
 
     async def watch_cleanup(self):
-        """Watch for cleanup event"""
+        """Watch for cleanup event, then stop the other session tasks"""
         while self.running:
             if self.cleanup_event and self.cleanup_event.is_set():
                 self.running = False
                 break
             await asyncio.sleep(0.1)
+        # Tasks waiting on queues or the websocket never see running go False
+        current = asyncio.current_task()
+        for task in self._tasks:
+            if task is not current:
+                task.cancel()
@@ -0,0 +1,177 @@
+"""Headless Gemini session: no Tkinter, no equalizer
+
+    python headless.py --mode "Code Expert" --voice Puck --allow-interruptions
+    python headless.py --config session.json --duration 300
+    python standalone.py --headless ...
+
+Settings come from a JSON config file (any GeminiConnection config key,
+plus "mode" to pick a preset from GEMINI_MODES) overridden by command line
+arguments. SIGINT / SIGTERM stop the session cleanly; a second signal
+exits immediately. A stats summary is printed when the session ends.
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+import sys
+import threading
+import time
+
+from dotenv import load_dotenv
+
+from modes import GEMINI_MODES, VOICES
+
+DEFAULT_MODE = "Analytical Genius"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run a Gemini session without the GUI")
+    parser.add_argument("--config", help="JSON file with session settings")
+    parser.add_argument("--mode", choices=list(GEMINI_MODES), help=f"preset mode (default {DEFAULT_MODE!r})")
+    parser.add_argument("--voice", choices=VOICES, help="voice for Gemini's audio (default Kore)")
+    parser.add_argument("--video-mode", help="none, camera, screen or screen:N (default none)")
+    parser.add_argument("--allow-interruptions", action="store_true", default=None,
+                        help="keep listening while Gemini speaks")
+    parser.add_argument("--silence-suppression", action="store_true", default=None,
+                        help="stop sending audio between utterances")
+    parser.add_argument("--echo-cancellation", action="store_true", default=None,
+                        help="remove speaker echo from the microphone signal")
+    parser.add_argument("--metrics-dir", help="write metrics.json / metrics.prom here during the session")
+    parser.add_argument("--endpoint", help="websocket URL to use instead of the Gemini endpoint")
+    parser.add_argument("--duration", type=float, help="stop the session after this many seconds")
+    parser.add_argument("--list-modes", action="store_true", help="print the available modes and exit")
+    return parser.parse_args(argv)
+
+
+def build_config(args):
+    """Merge mode preset, config file and command line arguments into a session config"""
+    file_config = {}
+    if args.config:
+        with open(args.config) as f:
+            file_config = json.load(f)
+
+    mode_name = args.mode or file_config.pop("mode", DEFAULT_MODE)
+    if mode_name not in GEMINI_MODES:
+        raise ValueError(f"Unknown mode {mode_name!r}; use --list-modes")
+    mode = GEMINI_MODES[mode_name]
+
+    config = {
+        "system_prompt": mode.prompt,
+        "voice": "Kore",
+        "video_mode": "none",
+        "allow_interruptions": False,
+        "temperature": mode.temperature,
+        "top_p": mode.top_p,
+        "top_k": mode.top_k
+    }
+    config.update(file_config)
+    for key, value in (
+        ("voice", args.voice),
+        ("video_mode", args.video_mode),
+        ("allow_interruptions", args.allow_interruptions),
+        ("silence_suppression", args.silence_suppression),
+        ("echo_cancellation", args.echo_cancellation),
+        ("metrics_dir", args.metrics_dir),
+        ("endpoint", args.endpoint),
+    ):
+        if value is not None:
+            config[key] = value
+    return mode_name, config
+
+
+def format_session_summary(client, elapsed):
+    """One block of end-of-session statistics"""
+    counters = client.metrics.counters
+    first_audio = client.metrics.histograms.get("time_to_first_audio_ms")
+    first_audio_stats = first_audio.summary() if first_audio else {"count": 0}
+    lines = [
+        f"Session summary ({elapsed:.1f}s):",
+        f"  turns: {counters.get('turns', 0)} ({counters.get('turns_interrupted', 0)} interrupted)",
+        f"  audio sent: {counters.get('audio_bytes_sent', 0) / 1024:.0f} KiB "
+        f"in {counters.get('audio_packets_sent', 0)} messages",
+        f"  audio received: {counters.get('audio_bytes_received', 0) / 1024:.0f} KiB "
+        f"in {counters.get('messages_received', 0)} messages",
+        f"  reconnects: {client.reconnects}",
+        f"  playback: {client.jitter_buffer.underruns} underruns, {client.jitter_buffer.overruns} overruns",
+    ]
+    if first_audio_stats["count"]:
+        lines.append(
+            f"  time to first audio: p50 {first_audio_stats['p50']:.0f} ms, "
+            f"p90 {first_audio_stats['p90']:.0f} ms"
+        )
+    if client.loop_lag:
+        lines.append(f"  {client.loop_lag.format_summary()}")
+    return "\n".join(lines)
+
+
+async def run_session(config, duration=None):
+    """Run one session until it ends, a signal arrives or duration elapses"""
+    from gemini_connection import GeminiConnection
+
+    cleanup_event = threading.Event()
+    video_capture = None
+    if config.get("video_mode", "none") != "none":
+        from video_capture import VideoCapture
+        video_capture = VideoCapture(config["video_mode"], region=config.get("screen_region"))
+
+    client = GeminiConnection(config, cleanup_event, video_capture=video_capture)
+    loop = asyncio.get_running_loop()
+
+    def stop(signum):
+        print(f"\n{signal.Signals(signum).name} received, stopping session...")
+        cleanup_event.set()
+        # A second signal falls through to the default handler
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.remove_signal_handler(sig)
+
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop, sig)
+        except NotImplementedError:
+            # Windows: no loop signal handlers
+            signal.signal(sig, lambda signum, frame: cleanup_event.set())
+
+    if duration:
+        loop.call_later(duration, cleanup_event.set)
+
+    start = time.monotonic()
+    try:
+        await client.start()
+    finally:
+        if video_capture:
+            video_capture.release()
+        print(format_session_summary(client, time.monotonic() - start))
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.list_modes:
+        for name, mode in GEMINI_MODES.items():
+            print(f"{name} (temperature {mode.temperature}, top_p {mode.top_p}, top_k {mode.top_k})")
+        return 0
+
+    load_dotenv()
+    if not os.environ.get("GEMINI_API_KEY"):
+        print("Error: GEMINI_API_KEY environment variable is not set")
+        return 1
+
+    try:
+        mode_name, config = build_config(args)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        return 1
+
+    print(f"Starting headless session: {mode_name}, voice {config['voice']}, video {config['video_mode']}")
+    try:
+        asyncio.run(run_session(config, args.duration))
+    except KeyboardInterrupt:
+        return 130
+    except Exception as e:
+        print(f"Session failed: {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+import io
+
+import numpy as np
+
+
+class PillowJpegEncoder:
+    """Resizes and JPEG-encodes BGR(A) frames with Pillow, reusing one output buffer"""
+    name = "pillow"
+
+    def __init__(self):
+        import PIL.Image
+        self._image_module = PIL.Image
+        self._output = io.BytesIO()
+
+    def encode(self, pixels, max_size, quality):
+        img = self._image_module.fromarray(np.ascontiguousarray(pixels[:, :, 2::-1]))
+        img.thumbnail([max_size, max_size])
+        self._output.seek(0)
+        self._output.truncate()
+        img.save(self._output, format="jpeg", quality=quality)
+        return self._output.getvalue()
+
+
+class OpenCVJpegEncoder:
+    """Resizes and JPEG-encodes BGR(A) frames straight from the NumPy buffer with OpenCV
+
+    Returns a memoryview over the encoded buffer, avoiding a copy to bytes.
+    """
+    name = "opencv"
+
+    def __init__(self):
+        import cv2
+        self._cv2 = cv2
+
+    def encode(self, pixels, max_size, quality):
+        cv2 = self._cv2
+        if pixels.shape[2] == 4:
+            pixels = cv2.cvtColor(pixels, cv2.COLOR_BGRA2BGR)
+        else:
+            pixels = np.ascontiguousarray(pixels)
+
+        height, width = pixels.shape[:2]
+        scale = max_size / max(height, width)
+        if scale < 1:
+            size = (max(1, round(width * scale)), max(1, round(height * scale)))
+            pixels = cv2.resize(pixels, size, interpolation=cv2.INTER_AREA)
+
+        ok, encoded = cv2.imencode(".jpg", pixels, [cv2.IMWRITE_JPEG_QUALITY, int(quality)])
+        if not ok:
+            raise RuntimeError("cv2.imencode failed")
+        return memoryview(encoded.reshape(-1))
+
+
+ENCODERS = {
+    "opencv": OpenCVJpegEncoder,
+    "pillow": PillowJpegEncoder,
+}
+
+
+def create_encoder(name="auto"):
+    """Create a JPEG encoder by name; "auto" prefers OpenCV and falls back to Pillow"""
+    if name != "auto":
+        return ENCODERS[name]()
+    try:
+        return OpenCVJpegEncoder()
+    except ImportError:
+        return PillowJpegEncoder()
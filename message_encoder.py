@@ -0,0 +1,65 @@
+import binascii
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(obj) -> str:
+    """Serialize a message to JSON text, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj)
+
+
+def loads(data):
+    """Parse a JSON message (str or bytes), using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class MediaChunkEncoder:
+    """Builds realtime_input.media_chunks messages from a fixed JSON template
+
+    binascii.b2a_base64 encodes the payload into a new bytes object, which
+    encode() copies into a reusable bytearray between a precomputed prefix
+    and suffix, so no dict, intermediate str or json.dumps pass is needed
+    per message. The memoryview returned by encode() aliases that buffer
+    and is only valid until the next call; encode_bytes() returns an
+    independent message for handing to another thread.
+    """
+    PREFIX = b'{"realtime_input": {"media_chunks": [{"data": "'
+
+    def __init__(self, mime_type):
+        self.mime_type = mime_type
+        self.suffix = b'", "mime_type": ' + json.dumps(mime_type).encode() + b'}]}}'
+        self._buffer = bytearray()
+
+    def _reserve(self, size):
+        if len(self._buffer) < size:
+            # Replace rather than resize so views handed out earlier stay valid
+            self._buffer = bytearray(size)
+            self._buffer[:len(self.PREFIX)] = self.PREFIX
+
+    def encode(self, data) -> memoryview:
+        """Return the complete JSON message for one chunk of raw media bytes"""
+        start = len(self.PREFIX)
+        end = start + 4 * ((len(data) + 2) // 3)
+        total = end + len(self.suffix)
+        self._reserve(total)
+
+        buffer = self._buffer
+        buffer[start:end] = binascii.b2a_base64(data, newline=False)
+        buffer[end:total] = self.suffix
+        return memoryview(buffer)[:total]
+
+    def encode_bytes(self, data) -> bytes:
+        """Like encode(), but returns a new bytes object that does not alias the buffer"""
+        return b"".join((self.PREFIX, binascii.b2a_base64(data, newline=False), self.suffix))
+
+    def encode_text(self, data) -> str:
+        """Like encode(), but returns the message as a str"""
+        return str(self.encode(data), 'ascii')
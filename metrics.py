@@ -0,0 +1,222 @@
+import asyncio
+import json
+import os
+import time
+from bisect import bisect_left
+from collections import deque
+
+# Histogram upper bounds; latencies are in milliseconds
+LATENCY_BUCKETS_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+DEPTH_BUCKETS = (0, 1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+
+
+class LoopLagMonitor:
+    """Measures event loop blocking by sampling how late a periodic sleep wakes up"""
+    def __init__(self, interval=0.01, window=2000):
+        self.interval = interval
+        self.samples = deque(maxlen=window)
+        self.max_lag = 0.0
+        self.total_lag = 0.0
+        self.count = 0
+
+    def record(self, lag):
+        """Record one lag sample in seconds"""
+        self.samples.append(lag)
+        self.count += 1
+        self.total_lag += lag
+        if lag > self.max_lag:
+            self.max_lag = lag
+
+    async def run(self, should_run):
+        """Sample loop lag until should_run() returns False"""
+        while should_run():
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.record(max(0.0, time.perf_counter() - start - self.interval))
+
+    def summary(self):
+        """Return lag statistics in milliseconds"""
+        if not self.count:
+            return {"samples": 0}
+        ordered = sorted(self.samples)
+        return {
+            "samples": self.count,
+            "mean_ms": self.total_lag / self.count * 1000,
+            "p99_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000,
+            "max_ms": self.max_lag * 1000,
+            "blocked_ms": self.total_lag * 1000
+        }
+
+    def format_summary(self):
+        stats = self.summary()
+        if not stats["samples"]:
+            return "Event loop lag: no samples"
+        return (
+            f"Event loop lag: mean {stats['mean_ms']:.2f} ms, "
+            f"p99 {stats['p99_ms']:.2f} ms, max {stats['max_ms']:.2f} ms "
+            f"over {stats['samples']} samples"
+        )
+
+
+class StageTimings:
+    """Accumulates per-stage durations, e.g. grab/convert/resize/encode per frame"""
+    def __init__(self):
+        self.totals = {}
+        self.maxima = {}
+        self.counts = {}
+        self.last = {}
+
+    def record(self, stage, seconds):
+        self.last[stage] = seconds
+        self.totals[stage] = self.totals.get(stage, 0.0) + seconds
+        self.counts[stage] = self.counts.get(stage, 0) + 1
+        if seconds > self.maxima.get(stage, 0.0):
+            self.maxima[stage] = seconds
+
+    def summary(self):
+        """Return {stage: {"count", "mean_ms", "max_ms"}}"""
+        return {
+            stage: {
+                "count": self.counts[stage],
+                "mean_ms": self.totals[stage] / self.counts[stage] * 1000,
+                "max_ms": self.maxima[stage] * 1000
+            }
+            for stage in self.totals
+        }
+
+    def format_summary(self, label):
+        if not self.totals:
+            return f"{label} timings: no samples"
+        stages = ", ".join(
+            f"{stage} {stats['mean_ms']:.1f}/{stats['max_ms']:.1f}"
+            for stage, stats in self.summary().items()
+        )
+        return f"{label} timings (mean/max ms): {stages}"
+
+
+class Histogram:
+    """Fixed-bucket histogram; observe() is a bisect and three additions"""
+    def __init__(self, buckets=LATENCY_BUCKETS_MS, description=""):
+        self.buckets = tuple(sorted(buckets))
+        self.description = description
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        """Estimate a quantile by interpolating within its bucket"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if seen + count >= rank and count:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.max
+                return min(lower + (upper - lower) * (rank - seen) / count, self.max)
+            seen += count
+        return self.max
+
+    def summary(self):
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "mean": self.sum / self.count,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "max": self.max
+        }
+
+
+class PipelineMetrics:
+    """Named histograms and counters for a session, exported as JSON or Prometheus text
+
+    Histograms are created on first observe() with latency buckets unless
+    declared with histogram() first. Names ending in _ms are milliseconds.
+    """
+    def __init__(self, prefix="gemini"):
+        self.prefix = prefix
+        self.histograms = {}
+        self.counters = {}
+
+    def histogram(self, name, buckets=LATENCY_BUCKETS_MS, description=""):
+        if name not in self.histograms:
+            self.histograms[name] = Histogram(buckets, description)
+        return self.histograms[name]
+
+    def observe(self, name, value):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histogram(name)
+        histogram.observe(value)
+
+    def inc(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def snapshot(self):
+        """Return all metrics as a JSON-serializable dict"""
+        return {
+            "timestamp": time.time(),
+            "histograms": {
+                name: dict(
+                    histogram.summary(),
+                    buckets=dict(zip([str(b) for b in histogram.buckets] + ["+Inf"], histogram.counts))
+                )
+                for name, histogram in self.histograms.items()
+            },
+            "counters": dict(self.counters)
+        }
+
+    def to_prometheus(self):
+        """Render metrics in the Prometheus text exposition format"""
+        lines = []
+        for name, histogram in self.histograms.items():
+            metric = f"{self.prefix}_{name}"
+            if histogram.description:
+                lines.append(f"# HELP {metric} {histogram.description}")
+            lines.append(f"# TYPE {metric} histogram")
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                lines.append(f'{metric}_bucket{{le="{bound}"}} {cumulative}')
+            lines.append(f'{metric}_bucket{{le="+Inf"}} {histogram.count}')
+            lines.append(f"{metric}_sum {histogram.sum}")
+            lines.append(f"{metric}_count {histogram.count}")
+        for name, value in self.counters.items():
+            metric = f"{self.prefix}_{name}_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, directory):
+        """Write metrics.json and metrics.prom to directory, replacing them atomically"""
+        os.makedirs(directory, exist_ok=True)
+        for filename, content in (
+            ("metrics.json", json.dumps(self.snapshot(), indent=2)),
+            ("metrics.prom", self.to_prometheus()),
+        ):
+            path = os.path.join(directory, filename)
+            with open(path + ".tmp", "w") as f:
+                f.write(content)
+            os.replace(path + ".tmp", path)
+
+    def format_summary(self, names=None):
+        lines = []
+        for name in names or self.histograms:
+            stats = self.histograms[name].summary() if name in self.histograms else {"count": 0}
+            if stats["count"]:
+                lines.append(
+                    f"  {name}: p50 {stats['p50']:.2f}, p90 {stats['p90']:.2f}, "
+                    f"p99 {stats['p99']:.2f}, max {stats['max']:.2f} (n={stats['count']})"
+                )
+        return "Pipeline latency:\n" + "\n".join(lines) if lines else "Pipeline latency: no samples"
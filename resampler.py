@@ -0,0 +1,125 @@
+from math import gcd
+
+import numpy as np
+
+
+class Resampler:
+    """Streaming rational polyphase resampler for mono float32 audio
+
+    Converts rate_in to rate_out by the reduced ratio L/M with a
+    Kaiser-windowed sinc low-pass split into L phases of taps_per_phase
+    taps. Each call computes a whole block with one gather and one
+    multiply-sum; filter history is carried across calls so blocks can be
+    any length.
+    """
+    def __init__(self, rate_in, rate_out, taps_per_phase=16, rolloff=0.9, beta=8.0):
+        divisor = gcd(rate_in, rate_out)
+        self.up = rate_out // divisor
+        self.down = rate_in // divisor
+        self.rate_in = rate_in
+        self.rate_out = rate_out
+        self.taps = taps_per_phase
+
+        num_taps = taps_per_phase * self.up
+        cutoff = rolloff / max(self.up, self.down)
+        t = np.arange(num_taps) - (num_taps - 1) / 2
+        h = cutoff * np.sinc(cutoff * t) * np.kaiser(num_taps, beta)
+        h *= self.up / h.sum()
+        # phases[p, k] = h[k * up + p]
+        self._phases = h.reshape(taps_per_phase, self.up).T.astype(np.float32)
+        self._offsets = np.arange(taps_per_phase)
+
+        self.reset()
+
+    def reset(self):
+        self._history = np.zeros(self.taps - 1, dtype=np.float32)
+        self._consumed = 0
+        self._produced = 0
+
+    def process(self, samples):
+        """Resample the next block of float32 samples and return the output block"""
+        samples = np.asarray(samples, dtype=np.float32)
+        total = self._consumed + len(samples)
+        end = -(-total * self.up // self.down)
+        n = np.arange(self._produced, end)
+
+        position = n * self.down
+        center = position // self.up
+        phase = position % self.up
+
+        extended = np.concatenate((self._history, samples))
+        # Index into extended: absolute input index minus that of extended[0]
+        index = center[:, None] - self._offsets[None, :] - (self._consumed - (self.taps - 1))
+        out = np.einsum("ij,ij->i", extended[index], self._phases[phase])
+
+        self._history = extended[len(extended) - (self.taps - 1):]
+        self._consumed = total
+        self._produced = end
+        return out.astype(np.float32, copy=False)
+
+    def process_int16(self, data: bytes) -> bytes:
+        """Resample a block of int16 PCM bytes"""
+        samples = np.frombuffer(data, dtype=np.int16).astype(np.float32)
+        out = self.process(samples)
+        return np.clip(np.rint(out), -32768, 32767).astype(np.int16).tobytes()
+
+
+class CaptureConverter:
+    """Turns native-rate, possibly multichannel device input into fixed-size mono int16 frames
+
+    Device callbacks deliver float32 (or int16) interleaved audio at the
+    device rate; process() downmixes, resamples to rate and returns the
+    complete frame_size-sample frames available so far as int16 bytes.
+    """
+    def __init__(self, device_rate, channels, rate=16000, frame_size=512, sample_format=np.float32):
+        self.channels = channels
+        self.frame_size = frame_size
+        self.sample_format = np.dtype(sample_format)
+        self.resampler = Resampler(device_rate, rate) if device_rate != rate else None
+        self._pending = np.zeros(0, dtype=np.float32)
+
+    def process(self, data: bytes):
+        samples = np.frombuffer(data, dtype=self.sample_format)
+        if self.sample_format == np.int16:
+            samples = samples.astype(np.float32) * (1 / 32768)
+        if self.channels > 1:
+            samples = samples.reshape(-1, self.channels).mean(axis=1)
+        if self.resampler:
+            samples = self.resampler.process(samples)
+
+        pending = np.concatenate((self._pending, samples))
+        count = len(pending) // self.frame_size
+        self._pending = pending[count * self.frame_size:]
+        if not count:
+            return []
+        pcm = np.clip(pending[:count * self.frame_size] * 32768, -32768, 32767).astype(np.int16)
+        return [frame.tobytes() for frame in pcm.reshape(count, self.frame_size)]
+
+
+class PlaybackConverter:
+    """Serves native-rate, multichannel device output from a mono int16 source
+
+    read(frame_count, source) pulls just enough int16 audio from
+    source(nbytes) to produce frame_count device frames, resampled from
+    rate to the device rate and copied to every channel, as float32 bytes.
+    """
+    def __init__(self, device_rate, channels, rate=24000):
+        self.channels = channels
+        self.rate = rate
+        self.device_rate = device_rate
+        self.resampler = Resampler(rate, device_rate) if device_rate != rate else None
+        self._pending = np.zeros(0, dtype=np.float32)
+
+    def read(self, frame_count, source):
+        pending = self._pending
+        while len(pending) < frame_count:
+            needed = -(-(frame_count - len(pending)) * self.rate // self.device_rate)
+            samples = np.frombuffer(source(needed * 2), dtype=np.int16).astype(np.float32) * (1 / 32768)
+            if self.resampler:
+                samples = self.resampler.process(samples)
+            pending = np.concatenate((pending, samples))
+        self._pending = pending[frame_count:]
+        out = pending[:frame_count]
+        if self.channels > 1:
+            out = np.repeat(out, self.channels)
+        return out.astype(np.float32).tobytes()
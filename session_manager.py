@@ -0,0 +1,181 @@
+import asyncio
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from metrics import LoopLagMonitor
+
+
+class ManagedSession:
+    """Bookkeeping for one session run by SessionManager"""
+    def __init__(self, session_id, client, cleanup_event):
+        self.id = session_id
+        self.client = client
+        self.cleanup_event = cleanup_event
+        self.future = None
+        self.state = "starting"
+        self.error = None
+        self.started_at = time.time()
+        self.ended_at = None
+
+    def info(self):
+        client = self.client
+        end = self.ended_at or time.time()
+        return {
+            "id": self.id,
+            "state": self.state,
+            "voice": client.config.get("voice"),
+            "video_mode": client.config.get("video_mode", "none"),
+            "uptime_s": end - self.started_at,
+            "turns": client.metrics.counters.get("turns", 0),
+            "reconnects": client.reconnects,
+            "error": str(self.error) if self.error else None
+        }
+
+
+class SessionManager:
+    """Runs many GeminiConnection sessions on one shared event loop
+
+    One loop thread hosts every session instead of a thread and
+    asyncio.run() per session. Sessions share:
+
+    - the VAD model, loaded once by load_vad_model (an ONNX model shares one
+      inference session; TorchScript needs a per-session copy because its
+      recurrent state lives in the module),
+    - a bounded VAD executor that runs inference for all sessions in place
+      of one worker thread per session,
+    - the loop's default executor, used for blocking calls (to_thread),
+    - one PyAudio instance,
+    - one LoopLagMonitor for the shared loop (sessions run their own only
+      if their config sets "loop_lag_monitor": True).
+
+    start_session(), stop_session() and list_sessions() may be called from
+    any thread.
+    """
+    def __init__(self, max_workers=None, vad_workers=None):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="session-io")
+        self.vad_executor = ThreadPoolExecutor(
+            max_workers=vad_workers or os.cpu_count() or 4, thread_name_prefix="vad"
+        )
+        self.loop = asyncio.new_event_loop()
+        self.loop.set_default_executor(self.executor)
+        self._thread = threading.Thread(target=self.loop.run_forever, name="session-loop", daemon=True)
+        self._thread.start()
+        self.audio = None
+        self._audio_lock = threading.Lock()
+        self.sessions = {}
+        self._starting = set()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.loop_lag = LoopLagMonitor()
+        self._monitoring = True
+        self._monitor = asyncio.run_coroutine_threadsafe(self.loop_lag.run(lambda: self._monitoring), self.loop)
+
+    def _shared_audio(self):
+        with self._audio_lock:
+            if self.audio is None:
+                import pyaudio
+                self.audio = pyaudio.PyAudio()
+            return self.audio
+
+    def start_session(self, config, session_id=None, session_class=None, **kwargs):
+        """Create a session for config and start it on the shared loop; returns its id
+
+        session_class defaults to GeminiConnection; extra keyword arguments
+        are passed to its constructor.
+        """
+        if session_class is None:
+            from gemini_connection import GeminiConnection
+            session_class = GeminiConnection
+
+        with self._lock:
+            session_id = session_id or f"session-{next(self._ids)}"
+            if session_id in self.sessions or session_id in self._starting:
+                raise ValueError(f"Session {session_id!r} already exists")
+            self._starting.add(session_id)
+
+        # Built outside the lock: a cold VAD load or PyAudio init can take a
+        # while and must not hold up list_sessions() / stop_session()
+        try:
+            cleanup_event = threading.Event()
+            client = session_class(
+                {"loop_lag_monitor": False, **config}, cleanup_event,
+                audio=self._shared_audio(),
+                vad_executor=self.vad_executor,
+                **kwargs
+            )
+        except BaseException:
+            with self._lock:
+                self._starting.discard(session_id)
+            raise
+
+        managed = ManagedSession(session_id, client, cleanup_event)
+        with self._lock:
+            self._starting.discard(session_id)
+            self.sessions[session_id] = managed
+            managed.future = asyncio.run_coroutine_threadsafe(self._run(managed), self.loop)
+        return session_id
+
+    async def _run(self, managed):
+        managed.state = "running"
+        try:
+            await managed.client.start()
+            managed.state = "stopped"
+        except Exception as e:
+            print(f"Session {managed.id} failed: {e}")
+            managed.state = "failed"
+            managed.error = e
+        finally:
+            managed.ended_at = time.time()
+
+    def stop_session(self, session_id, timeout=10.0):
+        """Stop a session, wait for it to finish and forget it; returns its final info"""
+        with self._lock:
+            managed = self.sessions.pop(session_id)
+        managed.cleanup_event.set()
+        try:
+            managed.future.result(timeout)
+        except FutureTimeoutError:
+            print(f"Session {session_id} did not stop within {timeout}s")
+        return managed.info()
+
+    def get_session(self, session_id):
+        """Return the GeminiConnection of a running session"""
+        return self.sessions[session_id].client
+
+    def list_sessions(self):
+        """Return info dicts for all sessions, including ones that ended on their own"""
+        with self._lock:
+            return [managed.info() for managed in self.sessions.values()]
+
+    def shutdown(self, timeout=10.0):
+        """Stop all sessions, the loop and the shared resources"""
+        for session_id in list(self.sessions):
+            self.stop_session(session_id, timeout)
+        self._monitoring = False
+        try:
+            self._monitor.result(timeout)
+        except FutureTimeoutError:
+            pass
+        print(self.loop_lag.format_summary())
+        try:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                print(f"Session loop did not stop within {timeout}s; leaving it open")
+            else:
+                self.loop.close()
+        finally:
+            self.vad_executor.shutdown(wait=False)
+            self.executor.shutdown(wait=False)
+            if self.audio is not None:
+                self.audio.terminate()
+                self.audio = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
@@ -1,30 +1,81 @@
+import time
+_LAUNCH_TIME = time.perf_counter()
+
+import argparse
 import os
 import sys
 from dotenv import load_dotenv
 import signal
-from config_gui import ConfigGUI
+from startup_timing import StartupReport
 
 def signal_handler(signum, frame):
     print("\nSignal received, cleaning up...")
     sys.exit(0)
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Gemini Multimodal Playground")
+    parser.add_argument(
+        "--startup-report",
+        action="store_true",
+        default=os.environ.get("GEMINI_STARTUP_REPORT", "") not in ("", "0"),
+        help="print startup phase and import time breakdown once the window is shown"
+    )
+    parser.add_argument(
+        "--no-prewarm",
+        action="store_true",
+        help="do not load the audio/VAD stack in the background after startup"
+    )
+    parser.add_argument(
+        "--preconnect",
+        action="store_true",
+        default=os.environ.get("GEMINI_PRECONNECT", "") not in ("", "0"),
+        help="connect and set up a Gemini session in the background before Start is clicked"
+    )
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="run a session without the GUI; other arguments go to headless.py (see --headless --help)"
+    )
+    return parser.parse_args()
+
 def main():
+    if "--headless" in sys.argv[1:]:
+        # No Tk, no equalizer: hand over before anything GUI-related is
+        # imported or parsed, so --help shows the headless options
+        from headless import main as headless_main
+        sys.exit(headless_main([arg for arg in sys.argv[1:] if arg != "--headless"]))
+    args = parse_args()
+    startup_report = None
+    if args.startup_report:
+        startup_report = StartupReport(start=_LAUNCH_TIME)
+        startup_report.enable_import_timing()
+
     # Load environment variables
     load_dotenv()
-    
+
     # Verify API key is set
     if not os.environ.get("GEMINI_API_KEY"):
         print("Error: GEMINI_API_KEY environment variable is not set")
         print("Please set it in your .env file or environment")
         sys.exit(1)
-    
+
     # Set up signal handlers
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
-    
+
     try:
+        from config_gui import ConfigGUI
+        if startup_report:
+            startup_report.mark("imports done")
+
         # Create and run GUI
-        gui = ConfigGUI()
+        gui = ConfigGUI(
+            startup_report=startup_report,
+            prewarm=not args.no_prewarm,
+            preconnect=args.preconnect
+        )
+        if startup_report:
+            startup_report.mark("gui built")
         gui.run()
     except Exception as e:
         print(f"Error running application: {e}")
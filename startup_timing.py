@@ -0,0 +1,77 @@
+import builtins
+import sys
+import time
+
+
+class ImportTimer:
+    """Records `-X importtime` style self/cumulative times for imports while installed"""
+    def __init__(self):
+        self.records = []
+        self._stack = []
+        self._original_import = None
+
+    def install(self):
+        if self._original_import is None:
+            self._original_import = builtins.__import__
+            builtins.__import__ = self._import
+
+    def uninstall(self):
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if level or name in sys.modules:
+            return self._original_import(name, globals, locals, fromlist, level)
+
+        self._stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += elapsed
+            self.records.append((len(self._stack), name, elapsed - children, elapsed))
+
+    def format_report(self, top=15):
+        """Return the slowest top-level imports and the slowest modules by self time"""
+        lines = ["import time: cumulative [ms] | top-level package"]
+        roots = sorted((r for r in self.records if r[0] == 0), key=lambda r: r[3], reverse=True)
+        for _, name, _, cumulative in roots[:top]:
+            lines.append(f"  {cumulative * 1000:10.1f} | {name}")
+        lines.append("import time: self [ms] | module")
+        by_self = sorted(self.records, key=lambda r: r[2], reverse=True)
+        for _, name, self_time, _ in by_self[:top]:
+            lines.append(f"  {self_time * 1000:10.1f} | {name}")
+        return "\n".join(lines)
+
+
+class StartupReport:
+    """Collects named startup phases relative to a start time"""
+    def __init__(self, start=None):
+        self.start = start if start is not None else time.perf_counter()
+        self.phases = []
+        self.import_timer = None
+
+    def mark(self, phase):
+        """Record that a phase finished now"""
+        self.phases.append((phase, time.perf_counter() - self.start))
+
+    def enable_import_timing(self):
+        self.import_timer = ImportTimer()
+        self.import_timer.install()
+
+    def format_report(self):
+        lines = ["Startup phases [ms since launch]:"]
+        for phase, elapsed in self.phases:
+            lines.append(f"  {elapsed * 1000:10.1f} | {phase}")
+        if self.import_timer:
+            lines.append(self.import_timer.format_report())
+        return "\n".join(lines)
+
+    def print_report(self):
+        if self.import_timer:
+            self.import_timer.uninstall()
+        print(self.format_report())
@@ -0,0 +1,509 @@
+import asyncio
+import base64
+import threading
+import time
+
+import numpy as np
+
+from image_encoders import create_encoder
+from message_encoder import MediaChunkEncoder
+from metrics import StageTimings
+
+
+class FrameChangeDetector:
+    """Decides whether a frame differs enough from the last sent one to be worth sending
+
+    Frames are compared on a strided thumbnail of about size x size pixels
+    using the mean absolute difference, normalized to [0, 1]. A keyframe is
+    forced every keyframe_interval seconds even on a static picture.
+    """
+    def __init__(self, threshold=0.01, keyframe_interval=10.0, size=32):
+        self.threshold = threshold
+        self.keyframe_interval = keyframe_interval
+        self.size = size
+        self._last_thumbnail = None
+        self._last_sent = 0.0
+        self.frames_skipped = 0
+
+    def thumbnail(self, pixels):
+        """Return a small int16 luminance-like thumbnail of an HxWxC uint8 array"""
+        height, width = pixels.shape[:2]
+        step_y = max(1, height // self.size)
+        step_x = max(1, width // self.size)
+        return pixels[::step_y, ::step_x, :3].sum(axis=2, dtype=np.int16)
+
+    def should_send(self, pixels) -> bool:
+        """Return True if the frame changed (or a keyframe is due) and remember it as sent
+
+        Call reset() if the frame ends up not being sent.
+        """
+        thumbnail = self.thumbnail(pixels)
+        now = time.monotonic()
+        last = self._last_thumbnail
+        if (last is None or last.shape != thumbnail.shape
+                or now - self._last_sent >= self.keyframe_interval):
+            changed = True
+        else:
+            difference = np.abs(thumbnail - last).mean() / (3 * 255)
+            changed = difference > self.threshold
+
+        if changed:
+            self._last_thumbnail = thumbnail
+            self._last_sent = now
+        else:
+            self.frames_skipped += 1
+        return changed
+
+    def reset(self):
+        """Forget the last sent frame, so the next one is sent regardless"""
+        self._last_thumbnail = None
+
+
+def downscale(pixels, max_size):
+    """Area-average an HxWxC uint8 array by the largest integer factor that keeps it >= max_size
+
+    This does the bulk of the resize on the raw capture buffer, so the JPEG
+    encoder only has to make a small final adjustment.
+    """
+    height, width = pixels.shape[:2]
+    factor = max(height, width) // max_size
+    if factor < 2:
+        return pixels
+    height -= height % factor
+    width -= width % factor
+    channels = pixels.shape[2]
+    dtype = np.uint16 if factor <= 16 else np.uint32
+
+    # Sum rows, then columns, over contiguous slices; much faster than a
+    # single sum over a 5-D reshaped view
+    rows = pixels[:height].reshape(height // factor, factor, pixels.shape[1], channels)
+    row_sums = rows[:, 0, :width].astype(dtype)
+    for i in range(1, factor):
+        row_sums += rows[:, i, :width]
+    columns = row_sums.reshape(height // factor, width // factor, factor, channels)
+    sums = columns[:, :, 0].copy()
+    for j in range(1, factor):
+        sums += columns[:, :, j]
+    sums //= factor * factor
+    return sums.astype(np.uint8)
+
+
+def list_screen_modes():
+    """Return the video modes for capturing all monitors or a single one"""
+    import mss
+
+    with mss.mss() as sct:
+        return ["screen"] + [f"screen:{i}" for i in range(1, len(sct.monitors))]
+
+
+class CameraGrabber:
+    """Continuously drains a cv2.VideoCapture on a background thread, keeping only the newest frame
+
+    Reading as fast as the driver delivers means its internal buffer never
+    holds stale frames, and latest() returns immediately.
+    """
+    def __init__(self, cap):
+        self.cap = cap
+        self._frame = None
+        self._sequence = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._exited = False
+        self._release_on_exit = False
+        self.read_failures = 0
+
+    def start(self):
+        self._stop.clear()
+        self._exited = False
+        self._thread = threading.Thread(target=self._run, name="camera-grabber", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=1.0):
+        """Stop the grabber thread; returns False if it is still blocked in cap.read()"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                print(f"Camera grabber did not stop within {timeout}s")
+                return False
+            self._thread = None
+        return True
+
+    def release_when_stopped(self):
+        """Release the capture once the grabber thread has left cap.read()"""
+        with self._lock:
+            if not self._exited:
+                self._release_on_exit = True
+                return
+        self.cap.release()
+
+    def latest(self):
+        """Return (sequence, frame) for the newest frame; frame is None before the first one"""
+        with self._lock:
+            return self._sequence, self._frame
+
+    def _run(self):
+        try:
+            while not self._stop.is_set():
+                ret, frame = self.cap.read()
+                if not ret:
+                    self.read_failures += 1
+                    self._stop.wait(0.05)
+                    continue
+                with self._lock:
+                    self._frame = frame
+                    self._sequence += 1
+        finally:
+            with self._lock:
+                self._exited = True
+                release = self._release_on_exit
+            if release:
+                self.cap.release()
+
+
+class VideoCapture:
+    """Handles video capture from camera or screen
+
+    Capture devices are opened on first use, so they belong to the thread
+    that reads frames (mss handles are thread-bound on some platforms).
+    When change_threshold is set, frames that are effectively identical to
+    the last one returned are skipped before any conversion or encoding.
+
+    Screen modes are 'screen' (all monitors) or 'screen:N' (monitor N).
+    region is an optional (left, top, width, height) rectangle relative to
+    the selected monitor; only that area is grabbed.
+
+    Frames stay NumPy arrays until the JPEG encoder ("opencv", "pillow" or
+    "auto", see image_encoders) turns them into bytes-like objects.
+    """
+    def __init__(self, mode='none', change_threshold=0.01, keyframe_interval=10.0,
+                 region=None, max_size=1200, camera_resolution=(1280, 720),
+                 encoder="auto"):
+        self.monitor_index = 0
+        if mode.startswith('screen:'):
+            self.monitor_index = int(mode.split(':', 1)[1])
+            mode = 'screen'
+        self.mode = mode
+        self.region = tuple(region) if region else None
+        self.max_size = max_size
+        self.quality = 75
+        self.encoder_name = encoder
+        self.encoder = None
+        self.camera_resolution = camera_resolution
+        self.cap = None
+        self.grabber = None
+        self._last_sequence = 0
+        self.sct = None
+        self._monitor = None
+        self.timings = StageTimings()
+        self.change_detector = None
+        if change_threshold is not None:
+            self.change_detector = FrameChangeDetector(change_threshold, keyframe_interval)
+
+    def _is_unchanged(self, pixels):
+        """Run change detection on raw pixels; True means skip this frame"""
+        if not self.change_detector:
+            return False
+        start = time.perf_counter()
+        unchanged = not self.change_detector.should_send(pixels)
+        self.timings.record("detect", time.perf_counter() - start)
+        return unchanged
+
+    def _open(self):
+        if self.mode == 'camera' and self.cap is None:
+            import cv2
+            self.cap = cv2.VideoCapture(0)
+            if self.camera_resolution:
+                # Let the device deliver frames close to what we send instead
+                # of capturing full resolution and thumbnailing
+                width, height = self.camera_resolution
+                self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+                self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+            self.grabber = CameraGrabber(self.cap)
+            self.grabber.start()
+        elif self.mode == 'screen' and self.sct is None:
+            import mss
+            self.sct = mss.mss()
+            self._monitor = self._resolve_monitor()
+
+    def _resolve_monitor(self):
+        """Return the mss grab rectangle for the selected monitor and region"""
+        monitors = self.sct.monitors
+        if not 0 <= self.monitor_index < len(monitors):
+            print(f"Monitor {self.monitor_index} not found, capturing all monitors")
+            self.monitor_index = 0
+        monitor = monitors[self.monitor_index]
+        if not self.region:
+            return monitor
+
+        left, top, width, height = self.region
+        left = min(max(0, left), monitor["width"] - 1)
+        top = min(max(0, top), monitor["height"] - 1)
+        return {
+            "left": monitor["left"] + left,
+            "top": monitor["top"] + top,
+            "width": max(1, min(width, monitor["width"] - left)),
+            "height": max(1, min(height, monitor["height"] - top))
+        }
+
+    def get_frame(self):
+        """Get current frame from selected video source"""
+        image_bytes = self.get_jpeg()
+        if not image_bytes:
+            return None
+        return {
+            "mime_type": "image/jpeg",
+            "data": base64.b64encode(image_bytes).decode()
+        }
+
+    def get_jpeg(self):
+        """Get current frame as raw JPEG data (bytes-like), or None"""
+        self._open()
+        if self.mode == 'camera':
+            return self._get_camera_frame()
+        elif self.mode == 'screen':
+            return self._get_screen_frame()
+        return None
+
+    def _get_camera_frame(self):
+        """Capture frame from camera"""
+        if not self.grabber:
+            return None
+        start = time.perf_counter()
+        sequence, frame = self.grabber.latest()
+        if frame is None or sequence == self._last_sequence:
+            return None
+        self._last_sequence = sequence
+        self.timings.record("grab", time.perf_counter() - start)
+        if self._is_unchanged(frame):
+            return None
+
+        return self._process_image(frame)
+
+    def _get_screen_frame(self):
+        """Capture frame from screen"""
+        if not self.sct:
+            return None
+        start = time.perf_counter()
+        screenshot = self.sct.grab(self._monitor)
+        pixels = np.asarray(screenshot)
+        self.timings.record("grab", time.perf_counter() - start)
+        if self._is_unchanged(pixels):
+            return None
+
+        return self._process_image(pixels)
+
+    def _process_image(self, pixels):
+        """Downscale a raw BGR(A) frame and encode it as JPEG for transmission"""
+        start = time.perf_counter()
+        pixels = downscale(pixels, self.max_size)
+        resized = time.perf_counter()
+        self.timings.record("resize", resized - start)
+
+        if self.encoder is None:
+            self.encoder = create_encoder(self.encoder_name)
+        image_bytes = self.encoder.encode(pixels, self.max_size, self.quality)
+        self.timings.record("encode", time.perf_counter() - resized)
+        return image_bytes
+
+    def frame_dropped(self):
+        """The last frame was never sent; send the next one even if unchanged"""
+        if self.change_detector:
+            self.change_detector.reset()
+
+    @property
+    def frames_skipped(self):
+        return self.change_detector.frames_skipped if self.change_detector else 0
+
+    def release(self):
+        """Release video capture resources"""
+        if self.grabber:
+            if not self.grabber.stop():
+                # Releasing the device under a blocked cap.read() crashes
+                # some OpenCV backends; let the grabber thread do it
+                self.grabber.release_when_stopped()
+                self.cap = None
+            self.grabber = None
+        if self.cap:
+            self.cap.release()
+            self.cap = None
+        if self.sct:
+            self.sct.close()
+            self.sct = None
+            self._monitor = None
+
+
+class AdaptiveVideoController:
+    """Adapts video frame interval, resolution and JPEG quality to the uplink
+
+    After every send it looks at how long the send took, how many bytes are
+    still queued in the websocket transport and the bitrate the last frame
+    implied. Congestion backs off multiplicatively (longer interval, lower
+    quality, smaller frames) so audio keeps the link; under budget it
+    recovers additively. Under severe congestion frames are dropped.
+    """
+    def __init__(self, target_bitrate=800_000, min_interval=1.0, max_interval=5.0,
+                 min_quality=35, max_quality=85, min_size=480, max_size=1200,
+                 max_send_time=0.05, max_buffered_bytes=64 * 1024):
+        self.target_bitrate = target_bitrate
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.min_quality = min_quality
+        self.max_quality = max_quality
+        self.min_size = min_size
+        self.max_size_limit = max_size
+        self.max_send_time = max_send_time
+        self.max_buffered_bytes = max_buffered_bytes
+
+        self.interval = min_interval
+        self.quality = 75
+        self.max_size = max_size
+        self.frames_dropped = 0
+
+    def should_drop(self, buffered_bytes) -> bool:
+        """True when the link is so backed up that this frame should not be sent"""
+        if buffered_bytes > 4 * self.max_buffered_bytes:
+            self.frames_dropped += 1
+            self._back_off()
+            return True
+        return False
+
+    def update(self, frame_bytes, send_time, buffered_bytes):
+        """Adjust settings after a frame of frame_bytes was sent in send_time seconds"""
+        bitrate = frame_bytes * 8 / self.interval
+        if send_time > self.max_send_time or buffered_bytes > self.max_buffered_bytes:
+            self._back_off()
+        elif bitrate > self.target_bitrate:
+            # Spend the budget on fewer bytes per frame before fewer frames
+            if self.quality > self.min_quality:
+                self.quality -= 5
+            elif self.max_size > self.min_size:
+                self.max_size = int(self.max_size * 0.85)
+            else:
+                self.interval *= 1.25
+        else:
+            headroom = bitrate < 0.7 * self.target_bitrate
+            if self.interval > self.min_interval:
+                self.interval -= 0.1
+            elif headroom and self.max_size < self.max_size_limit:
+                self.max_size += 80
+            elif headroom and self.quality < self.max_quality:
+                self.quality += 2
+        self._clamp()
+
+    def _back_off(self):
+        self.interval *= 1.5
+        self.quality -= 10
+        self.max_size = int(self.max_size * 0.8)
+        self._clamp()
+
+    def _clamp(self):
+        self.interval = min(max(self.interval, self.min_interval), self.max_interval)
+        self.quality = min(max(self.quality, self.min_quality), self.max_quality)
+        self.max_size = min(max(self.max_size, self.min_size), self.max_size_limit)
+
+    def apply(self, video_capture, worker):
+        """Push the current settings to the capture source and worker"""
+        video_capture.quality = self.quality
+        video_capture.max_size = self.max_size
+        worker.interval = self.interval
+
+    def __repr__(self):
+        return (f"AdaptiveVideoController(interval={self.interval:.2f}s, "
+                f"quality={self.quality}, max_size={self.max_size})")
+
+
+class LatestFrameSlot:
+    """Single-slot buffer between a producer thread and the event loop
+
+    A new frame replaces one that has not been taken yet, so the consumer
+    always gets the most recent frame and never works through a backlog.
+    """
+    def __init__(self, loop):
+        self._loop = loop
+        self._frame = None
+        self._lock = threading.Lock()
+        self._ready = asyncio.Event()
+        self.replaced = 0
+
+    def put(self, frame):
+        """Store a frame (producer thread)"""
+        with self._lock:
+            if self._frame is not None:
+                self.replaced += 1
+            self._frame = frame
+        try:
+            self._loop.call_soon_threadsafe(self._ready.set)
+        except RuntimeError:
+            # Event loop already closed
+            pass
+
+    def take(self):
+        """Return and clear the stored frame, or None"""
+        with self._lock:
+            frame, self._frame = self._frame, None
+            return frame
+
+    async def get(self):
+        """Wait for and return the newest frame (event loop)"""
+        while True:
+            self._ready.clear()
+            frame = self.take()
+            if frame is not None:
+                return frame
+            await self._ready.wait()
+
+
+class VideoCaptureWorker:
+    """Captures, JPEG-encodes and wraps frames in a realtime_input message off the event loop
+
+    Ready-to-send payloads are published to a LatestFrameSlot every
+    interval seconds; the event loop only has to send them.
+    """
+    def __init__(self, video_capture, interval=1.0):
+        self.video_capture = video_capture
+        self.interval = interval
+        self.encoder = MediaChunkEncoder("image/jpeg")
+        self.slot = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def timings(self):
+        return self.video_capture.timings
+
+    def start(self, loop=None):
+        self.slot = LatestFrameSlot(loop or asyncio.get_running_loop())
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="video-capture", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=2.0):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        next_frame = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                image_bytes = self.video_capture.get_jpeg()
+                if image_bytes:
+                    start = time.perf_counter()
+                    # Owned copy: the loop sends it while the next frame is encoded
+                    payload = self.encoder.encode_bytes(image_bytes)
+                    self.timings.record("message", time.perf_counter() - start)
+                    self.slot.put(payload)
+            except Exception as e:
+                print(f"Error capturing video: {e}")
+
+            next_frame += self.interval
+            delay = next_frame - time.monotonic()
+            if delay < 0:
+                # Capture is slower than the interval; don't try to catch up
+                next_frame = time.monotonic()
+                delay = 0
+            self._stop.wait(delay)
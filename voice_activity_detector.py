@@ -1,24 +1,315 @@
+import asyncio
+import copy
+import os
+import queue
+import threading
+import time
+
 import numpy as np
 import torch
 
+SILERO_REPO = 'snakers4/silero-vad'
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "gemini-playground")
+
+# Process-wide cache of loaded models, keyed by load options
+_shared_models = {}
+_shared_models_lock = threading.Lock()
+
+
+class OnnxSileroModel:
+    """Silero VAD ONNX model with per-detector state around a shared onnxruntime session"""
+    def __init__(self, session):
+        self.session = session
+        self.reset_states()
+
+    def reset_states(self, batch_size=1):
+        self._state = np.zeros((2, batch_size, 128), dtype=np.float32)
+        self._context = None
+
+    def __call__(self, x, sr):
+        x = np.asarray(x, dtype=np.float32).reshape(1, -1)
+        context_size = 64 if sr == 16000 else 32
+        if self._context is None:
+            self._context = np.zeros((1, context_size), dtype=np.float32)
+        x = np.concatenate([self._context, x], axis=1)
+        out, self._state = self.session.run(
+            None, {"input": x, "state": self._state, "sr": np.array(sr, dtype=np.int64)}
+        )
+        self._context = x[:, -context_size:]
+        return out
+
+
+def _load_shared_model(model_path, offline, cache_dir):
+    """Load the model from the first available source; returns (model, source)"""
+    if model_path:
+        if model_path.endswith(".onnx"):
+            import onnxruntime
+            options = onnxruntime.SessionOptions()
+            options.inter_op_num_threads = 1
+            options.intra_op_num_threads = 1
+            session = onnxruntime.InferenceSession(
+                model_path, sess_options=options, providers=["CPUExecutionProvider"]
+            )
+            return session, f"onnx:{model_path}"
+        return torch.jit.load(model_path, map_location="cpu"), f"jit:{model_path}"
+
+    cached_jit = os.path.join(cache_dir, "silero_vad.jit")
+    if os.path.exists(cached_jit):
+        return torch.jit.load(cached_jit, map_location="cpu"), f"jit:{cached_jit}"
+
+    hub_dir = os.path.join(torch.hub.get_dir(), "snakers4_silero-vad_master")
+    if os.path.isdir(hub_dir):
+        model, _ = torch.hub.load(repo_or_dir=hub_dir, model='silero_vad', source='local')
+        source = f"hub-cache:{hub_dir}"
+    elif offline:
+        raise RuntimeError(
+            f"Silero VAD model not found offline; expected {cached_jit} or {hub_dir}"
+        )
+    else:
+        model, _ = torch.hub.load(repo_or_dir=SILERO_REPO,
+                                  model='silero_vad',
+                                  force_reload=False)
+        source = f"hub:{SILERO_REPO}"
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        torch.jit.save(model, cached_jit)
+    except Exception as e:
+        print(f"Could not cache VAD model at {cached_jit}: {e}")
+    return model, source
+
+
+def load_vad_model(model_path=None, offline=None, cache_dir=None):
+    """Return a VAD model instance backed by a process-wide shared model
+
+    The first call loads the model (explicit model_path as .jit or .onnx,
+    then the local JIT cache, then the torch.hub cache, then a hub download
+    unless offline). Later calls only create a per-detector instance, so
+    recurrent state is never shared between sessions. Returns
+    (model, info) where info has "source", "cold" and "load_ms".
+    """
+    model_path = model_path or os.environ.get("SILERO_VAD_MODEL")
+    if offline is None:
+        offline = os.environ.get("SILERO_VAD_OFFLINE", "") not in ("", "0")
+    cache_dir = cache_dir or os.environ.get("SILERO_VAD_CACHE_DIR", DEFAULT_CACHE_DIR)
+
+    start = time.perf_counter()
+    key = (model_path, cache_dir)
+    with _shared_models_lock:
+        cold = key not in _shared_models
+        if cold:
+            shared, source = _load_shared_model(model_path, offline, cache_dir)
+            if isinstance(shared, torch.nn.Module):
+                shared.eval()
+            _shared_models[key] = (shared, source)
+        shared, source = _shared_models[key]
+
+    if isinstance(shared, torch.nn.Module):
+        model = copy.deepcopy(shared)
+    else:
+        model = OnnxSileroModel(shared)
+
+    info = {"source": source, "cold": cold, "load_ms": (time.perf_counter() - start) * 1000}
+    return model, info
+
+
+class VADResult:
+    """Outcome of pushing a single frame through the streaming detector"""
+    SPEECH_START = "speech_start"
+    SPEECH_END = "speech_end"
+
+    __slots__ = ("probability", "is_speech", "event")
+
+    def __init__(self, probability, is_speech, event=None):
+        self.probability = probability
+        self.is_speech = is_speech
+        self.event = event
+
+    def __repr__(self):
+        return (f"VADResult(probability={self.probability:.3f}, "
+                f"is_speech={self.is_speech}, event={self.event!r})")
+
 
 class VoiceActivityDetector:
-    def __init__(self):
-        self.model, _ = torch.hub.load(repo_or_dir='snakers4/silero-vad',
-                                     model='silero_vad',
-                                     force_reload=False)
-        self.model.eval()
+    def __init__(self, threshold=0.8, sample_rate=16000, chunk_size=512, min_silence_ms=100,
+                 model_path=None, offline=None):
+        self.model, self.load_info = load_vad_model(model_path=model_path, offline=offline)
+        print(
+            f"VAD model ready in {self.load_info['load_ms']:.0f} ms "
+            f"({'cold' if self.load_info['cold'] else 'warm'}, {self.load_info['source']})"
+        )
 
-    def is_speech(self, audio_data: bytes) -> bool:
-        # Convert raw bytes directly to numpy array of int16
+        self.threshold = threshold
+        # Hysteresis: once triggered, speech continues until the probability
+        # drops below this lower bound for min_silence_ms
+        self.neg_threshold = max(threshold - 0.15, 0.01)
+        self.sample_rate = sample_rate
+        self.chunk_size = chunk_size
+        self.min_silence_frames = max(1, round(min_silence_ms * sample_rate / (1000 * chunk_size)))
+
+        # Preallocated conversion buffers; the tensor shares memory with the array
+        self._buffers = {}
+        self._get_buffers(chunk_size)
+
+        self.triggered = False
+        self._silence_frames = 0
+
+    def _get_buffers(self, num_samples):
+        """Return the (float array, tensor) pair for frames of num_samples"""
+        buffers = self._buffers.get(num_samples)
+        if buffers is None:
+            audio_float = np.zeros(num_samples, dtype=np.float32)
+            buffers = (audio_float, torch.from_numpy(audio_float))
+            self._buffers[num_samples] = buffers
+        return buffers
+
+    def probability(self, audio_data: bytes) -> float:
+        """Return the speech probability for one frame of int16 PCM"""
         audio_np = np.frombuffer(audio_data, dtype=np.int16)
-        
-        # Convert to float32 and normalize to [-1, 1]
-        audio_float = audio_np.astype(np.float32) / 32768.0
-        
-        # Convert to torch tensor
-        audio_tensor = torch.from_numpy(audio_float)
-        
-        # Get speech probability
-        speech_prob = self.model(audio_tensor, 16000).item()
-        return speech_prob > 0.8  # Adjust threshold as needed
+        audio_float, audio_tensor = self._get_buffers(len(audio_np))
+
+        # Convert to float32 and normalize to [-1, 1] in place
+        np.multiply(audio_np, 1.0 / 32768.0, out=audio_float, casting='unsafe')
+
+        with torch.inference_mode():
+            return self.model(audio_tensor, self.sample_rate).item()
+
+    def reset(self):
+        """Reset the model's recurrent state and the speech trigger"""
+        if hasattr(self.model, "reset_states"):
+            self.model.reset_states()
+        self.triggered = False
+        self._silence_frames = 0
+
+    def push(self, frame: bytes) -> VADResult:
+        """Feed the next frame of the stream and return its VADResult
+
+        The model state is carried across calls, so frames must be pushed
+        in order. result.event is set on speech start / speech end.
+        """
+        speech_prob = self.probability(frame)
+        event = None
+
+        if speech_prob >= self.threshold:
+            self._silence_frames = 0
+            if not self.triggered:
+                self.triggered = True
+                event = VADResult.SPEECH_START
+        elif self.triggered and speech_prob < self.neg_threshold:
+            self._silence_frames += 1
+            if self._silence_frames >= self.min_silence_frames:
+                self.triggered = False
+                self._silence_frames = 0
+                event = VADResult.SPEECH_END
+
+        return VADResult(speech_prob, self.triggered or event == VADResult.SPEECH_END, event)
+
+    def process_stream(self, frames):
+        """Yield a VADResult for each frame of an iterable, starting from fresh state"""
+        self.reset()
+        for frame in frames:
+            yield self.push(frame)
+
+    def is_speech(self, audio_data: bytes) -> bool:
+        return self.probability(audio_data) > self.threshold
+
+
+class VADWorker:
+    """Runs VoiceActivityDetector.push off the event loop
+
+    Frames are fed through a bounded queue so inference never blocks the
+    asyncio event loop; (frame, VADResult) pairs are delivered back to the
+    loop, in order, on the results queue passed to start(). An optional
+    preprocess(frame) -> frame callable (e.g. echo cancellation) runs on the
+    same thread before inference, and the processed frame is delivered.
+
+    By default the worker owns a dedicated thread. Given an executor, it
+    instead runs each frame as an executor job, one at a time and in
+    order, so many sessions can share a fixed pool of inference threads.
+    """
+    def __init__(self, vad, maxsize=16, preprocess=None, executor=None):
+        self.vad = vad
+        self.preprocess = preprocess
+        self.executor = executor
+        self.maxsize = maxsize
+        self._requests = None
+        self._thread = None
+        self._task = None
+        self._loop = None
+        self.results = None
+        self.frames_processed = 0
+        self.frames_backpressured = 0
+
+    def start(self, results, loop=None):
+        """Start processing, delivering results to an asyncio.Queue"""
+        self._loop = loop or asyncio.get_running_loop()
+        self.results = results
+        self.vad.reset()
+        if self.executor:
+            self._requests = asyncio.Queue(maxsize=self.maxsize)
+            self._task = self._loop.create_task(self._run_pooled())
+        else:
+            self._requests = queue.Queue(maxsize=self.maxsize)
+            self._thread = threading.Thread(target=self._run, name="vad-worker", daemon=True)
+            self._thread.start()
+
+    async def submit(self, frame: bytes):
+        """Queue a frame for inference, waiting off-loop only if the queue is full"""
+        try:
+            self._requests.put_nowait(frame)
+        except (queue.Full, asyncio.QueueFull):
+            self.frames_backpressured += 1
+            if self._task:
+                await self._requests.put(frame)
+            else:
+                await asyncio.to_thread(self._requests.put, frame)
+
+    def stop(self, timeout=1.0):
+        """Stop the worker thread after it drains queued frames"""
+        if self._task:
+            self._task.cancel()
+            self._task = None
+            return
+        if not self._thread:
+            return
+        try:
+            self._requests.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+        self._thread = None
+
+    async def stop_async(self, timeout=1.0):
+        """stop() from the event loop, joining the worker thread off the loop"""
+        if self._thread:
+            await asyncio.to_thread(self.stop, timeout)
+        else:
+            self.stop(timeout)
+
+    def _process(self, frame):
+        try:
+            if self.preprocess:
+                frame = self.preprocess(frame)
+            result = self.vad.push(frame)
+        except Exception as e:
+            print(f"VAD worker error: {e}")
+            result = VADResult(0.0, False)
+        self.frames_processed += 1
+        return frame, result
+
+    async def _run_pooled(self):
+        while True:
+            frame = await self._requests.get()
+            self.results.put_nowait(await self._loop.run_in_executor(self.executor, self._process, frame))
+
+    def _run(self):
+        while True:
+            frame = self._requests.get()
+            if frame is None:
+                break
+            frame, result = self._process(frame)
+            try:
+                self._loop.call_soon_threadsafe(self.results.put_nowait, (frame, result))
+            except RuntimeError:
+                # Event loop already closed
+                break